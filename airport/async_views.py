@@ -0,0 +1,248 @@
+import base64
+import binascii
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from airport.models import Flight, Route, Ticket
+from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+from airport.serializers import (
+    AsyncFlightDetailSerializer,
+    AsyncFlightListSerializer,
+    RouteDetailSerializer,
+    RouteListSerializer,
+)
+from airport.views import (
+    _airports_named,
+    _filter_flights,
+    _param_to_int,
+    _past_keyset,
+)
+from user.authentication import StatelessJWTAuthentication
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _encode_cursor(*values):
+    return base64.urlsafe_b64encode(
+        "|".join(str(value) for value in values).encode()
+    ).decode()
+
+
+def _decode_cursor(cursor, count):
+    try:
+        values = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    except (binascii.Error, UnicodeDecodeError):
+        values = []
+    if len(values) != count:
+        raise exceptions.NotFound("Invalid cursor")
+    return values
+
+
+def _page_url(request, cursor):
+    params = request.GET.copy()
+    params["cursor"] = cursor
+    return request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+
+def _page_size(request):
+    return _param_to_int(
+        request.GET.get("page_size"),
+        "page_size",
+        default=PAGE_SIZE,
+        minimum=1,
+        maximum=MAX_PAGE_SIZE
+    )
+
+
+def _flights():
+    return (
+        Flight.objects
+        .select_related(
+            "airplane__airplane_type",
+            "route__source",
+            "route__destination"
+        )
+        .with_tickets_available()
+    )
+
+
+async def _load_crew_names(flights):
+    names = {flight.id: [] for flight in flights}
+    assignments = (
+        Flight.crew.through.objects
+        .filter(flight_id__in=names)
+        .select_related("crew")
+        .order_by("crew_id")
+    )
+    async for assignment in assignments.aiterator():
+        names[assignment.flight_id].append(assignment.crew.full_name)
+    for flight in flights:
+        flight.crew_names = names[flight.id]
+
+
+class AsyncReadOnlyView(View):
+    """Read-only JSON endpoint that runs on the event loop under ASGI.
+
+    Requests are authenticated, permitted and throttled like the DRF API,
+    without leaving the event loop: the stateless JWT authentication needs
+    no query and the shared throttles count with the async ORM. Subclasses
+    implement ``aget_data`` and return serializer data.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    authentication_class = StatelessJWTAuthentication
+    permission_class = IsAdminOrIfAuthenticatedReadOnly
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            await self.check_request(request)
+            data = await self.aget_data(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request, exc)
+        return JsonResponse(data, encoder=JSONEncoder)
+
+    async def check_request(self, request):
+        authenticated = self.authentication_class().authenticate(request)
+        request.user, request.auth = authenticated or (AnonymousUser(), None)
+
+        if not self.permission_class().has_permission(request, self):
+            if request.auth is None:
+                raise exceptions.NotAuthenticated()
+            raise exceptions.PermissionDenied()
+
+        for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+            throttle = throttle_class()
+            if hasattr(throttle, "aallow_request"):
+                allowed = await throttle.aallow_request(request, self)
+            else:
+                allowed = await sync_to_async(throttle.allow_request)(
+                    request, self
+                )
+            if not allowed:
+                raise exceptions.Throttled(throttle.wait())
+
+    def handle_exception(self, request, exc):
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {"detail": exc.detail}
+        response = JsonResponse(data, status=exc.status_code, safe=False)
+
+        if isinstance(exc, (
+            exceptions.NotAuthenticated, exceptions.AuthenticationFailed
+        )):
+            response["WWW-Authenticate"] = (
+                self.authentication_class().authenticate_header(request)
+            )
+        if getattr(exc, "wait", None):
+            response["Retry-After"] = "%d" % exc.wait
+        return response
+
+    async def aget_data(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+
+class AsyncFlightListView(AsyncReadOnlyView):
+    """Flights by departure time, with the filters of the flight list."""
+
+    async def aget_data(self, request):
+        page_size = _page_size(request)
+        queryset = _filter_flights(_flights(), request.GET).order_by(
+            "departure_time", "id"
+        )
+        cursor = request.GET.get("cursor")
+        if cursor:
+            queryset = queryset.filter(_past_keyset(
+                Flight, ("departure_time", "id"), _decode_cursor(cursor, 2)
+            ))
+
+        flights = [
+            flight async for flight in queryset[:page_size + 1].aiterator()
+        ]
+        next_url = None
+        if len(flights) > page_size:
+            flights = flights[:page_size]
+            next_url = _page_url(request, _encode_cursor(
+                flights[-1].departure_time.isoformat(), flights[-1].id
+            ))
+        await _load_crew_names(flights)
+
+        return {
+            "next": next_url,
+            "results": AsyncFlightListSerializer(flights, many=True).data,
+        }
+
+
+class AsyncFlightDetailView(AsyncReadOnlyView):
+    async def aget_data(self, request, pk):
+        try:
+            flight = await _flights().aget(pk=pk)
+        except Flight.DoesNotExist:
+            raise exceptions.NotFound()
+
+        await _load_crew_names([flight])
+        flight.ticket_list = [
+            ticket async for ticket in (
+                Ticket.objects
+                .filter(flight_id=pk)
+                .only("row", "seat")
+                .aiterator()
+            )
+        ]
+        return AsyncFlightDetailSerializer(flight).data
+
+
+class AsyncRouteListView(AsyncReadOnlyView):
+    """Routes by id, filtered by source and destination airport names."""
+
+    async def aget_data(self, request):
+        page_size = _page_size(request)
+        queryset = Route.objects.select_related(
+            "source", "destination"
+        ).order_by("id")
+        source = request.GET.get("source")
+        destination = request.GET.get("destination")
+        if source:
+            queryset = queryset.filter(source_id__in=_airports_named(source))
+        if destination:
+            queryset = queryset.filter(
+                destination_id__in=_airports_named(destination)
+            )
+        cursor = request.GET.get("cursor")
+        if cursor:
+            (route_id,) = _decode_cursor(cursor, 1)
+            if not route_id.isdigit():
+                raise exceptions.NotFound("Invalid cursor")
+            queryset = queryset.filter(id__gt=route_id)
+
+        routes = [
+            route async for route in queryset[:page_size + 1].aiterator()
+        ]
+        next_url = None
+        if len(routes) > page_size:
+            routes = routes[:page_size]
+            next_url = _page_url(request, _encode_cursor(routes[-1].id))
+
+        return {
+            "next": next_url,
+            "results": RouteListSerializer(routes, many=True).data,
+        }
+
+
+class AsyncRouteDetailView(AsyncReadOnlyView):
+    async def aget_data(self, request, pk):
+        try:
+            route = await Route.objects.select_related(
+                "source", "destination"
+            ).aget(pk=pk)
+        except Route.DoesNotExist:
+            raise exceptions.NotFound()
+
+        return RouteDetailSerializer(route).data
@@ -0,0 +1,99 @@
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def _generation_key(model):
+    return f"airport:generation:{model._meta.label_lower}"
+
+
+def bump_generation(model):
+    """Make every cached response that depends on ``model`` unreachable."""
+    cache.set(_generation_key(model), uuid.uuid4().hex, None)
+
+
+def _generations(models):
+    keys = [_generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, uuid.uuid4().hex, None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def _list_cache_key(request, basename, models):
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    url = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    return ":".join(["airport:list", basename, *_generations(models), url])
+
+
+class CachedListMixin:
+    """Serve rendered list responses from the cache.
+
+    ``cache_models`` are the models the list is built from. Their signals
+    call ``bump_generation``, which is part of the cache key, so a change
+    to any of them invalidates the cached pages. Cached responses carry an
+    ETag and are answered with 304 when ``If-None-Match`` matches.
+    """
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return super().list(request, *args, **kwargs)
+
+        key = _list_cache_key(request, self.basename, self.cache_models)
+        cached = cache.get(key)
+        if cached is not None:
+            etag, content, content_type = cached
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = HttpResponse(content, content_type=content_type)
+            response["ETag"] = etag
+            return response
+
+        response = super().list(request, *args, **kwargs)
+
+        def store(rendered):
+            etag = quote_etag(hashlib.md5(rendered.content).hexdigest())
+            rendered["ETag"] = etag
+            cache.set(
+                key,
+                (etag, rendered.content, rendered["Content-Type"]),
+                settings.RESPONSE_CACHE_TIMEOUT
+            )
+
+        if response.status_code == 200:
+            response.add_post_render_callback(store)
+        return response
+
+
+def conditional_response(request, version, last_modified, get_response):
+    """Answer with 304 if the client already has ``version``.
+
+    ``version`` is anything that changes whenever the resource does, and
+    ``last_modified`` its datetime. ``get_response`` builds the full
+    response and is only called when the client's copy is stale.
+    """
+    etag = quote_etag(hashlib.md5(
+        f"{request.get_full_path()}:{request.accepted_renderer.format}:"
+        f"{version}".encode()
+    ).hexdigest())
+    timestamp = int(last_modified.timestamp())
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    if response is None:
+        response = get_response()
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(timestamp)
+    return response
@@ -0,0 +1,112 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Echo:
+    """File-like object whose ``write`` hands back the written line."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[field]) for field in fields])
+
+
+def ndjson_lines(fields, rows):
+    for row in rows:
+        yield json.dumps(
+            {field: row[field] for field in fields}, cls=DjangoJSONEncoder
+        ) + "\n"
+
+
+def streaming_export(fmt, filename, fields, rows):
+    """Stream ``rows`` (dicts) as CSV or NDJSON, one line at a time.
+
+    ``rows`` should be a generator over ``QuerySet.iterator()`` so that
+    only one chunk of the table is in memory at any time.
+    """
+    lines = csv_lines if fmt == "csv" else ndjson_lines
+    response = StreamingHttpResponse(
+        lines(fields, rows), content_type=CONTENT_TYPES[fmt]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{fmt}"'
+    )
+    return response
+
+
+FLIGHT_FIELDS = (
+    "id", "source", "destination", "departure_time", "arrival_time",
+    "airplane", "airplane_type", "crew", "tickets_available",
+)
+
+
+def flight_rows(queryset):
+    """Rows of ``queryset``, which needs ``with_tickets_available()``."""
+    flights = (
+        queryset
+        .select_related(
+            "airplane__airplane_type",
+            "route__source",
+            "route__destination"
+        )
+        .prefetch_related("crew")
+        .order_by("departure_time", "id")
+    )
+    for flight in flights.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {
+            "id": flight.id,
+            "source": flight.route.source.name,
+            "destination": flight.route.destination.name,
+            "departure_time": flight.departure_time,
+            "arrival_time": flight.arrival_time,
+            "airplane": flight.airplane.name,
+            "airplane_type": flight.airplane.airplane_type.name,
+            "crew": [member.full_name for member in flight.crew.all()],
+            "tickets_available": flight.tickets_available,
+        }
+
+
+TICKET_FIELDS = (
+    "order", "created_at", "user", "ticket", "flight", "source",
+    "destination", "departure_time", "row", "seat",
+)
+
+
+def ticket_rows(queryset):
+    tickets = queryset.order_by("order_id", "id").values_list(
+        "order_id",
+        "order__created_at",
+        "order__user__email",
+        "id",
+        "flight_id",
+        "flight__route__source__name",
+        "flight__route__destination__name",
+        "flight__departure_time",
+        "row",
+        "seat",
+    )
+    for values in tickets.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield dict(zip(TICKET_FIELDS, values))
@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from airport.models import SeatHold, Ticket
+
+
+class SeatConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of these seats are already taken or held."
+    default_code = "seat_conflict"
+
+
+def seats_lookup(seats):
+    """Match any of the ``(flight_id, row, seat)`` triples."""
+    lookup = Q()
+    for flight_id, row, seat in seats:
+        lookup |= Q(flight_id=flight_id, row=row, seat=seat)
+    return lookup
+
+
+def describe_seats(seats, reason):
+    return [
+        f"seat {seat} in row {row} is {reason} on flight {flight_id}"
+        for flight_id, row, seat in sorted(seats)
+    ]
+
+
+def sold_seats(seats):
+    """The ``(flight_id, row, seat)`` triples of ``seats`` already sold."""
+    if not seats:
+        return set()
+    return set(
+        Ticket.objects
+        .filter(seats_lookup(seats))
+        .values_list("flight_id", "row", "seat")
+    )
+
+
+def _held_by_others(lookup, user_id, now):
+    return set(
+        SeatHold.objects
+        .filter(lookup, expires_at__gt=now)
+        .exclude(user_id=user_id)
+        .values_list("flight_id", "row", "seat")
+    )
+
+
+def _unavailable_seats(seats, user_id, now):
+    """Describe why ``seats`` could not be held after losing a race."""
+    sold = sold_seats(seats)
+    held = _held_by_others(seats_lookup(seats), user_id, now) - sold
+    errors = (
+        describe_seats(sold, "already taken")
+        + describe_seats(held, "held by another customer")
+    )
+    # The competing hold may already be gone again, released or sold
+    # after this transaction started.
+    return errors or describe_seats(
+        seats, "being booked by another customer"
+    )
+
+
+@transaction.atomic
+def hold_seats(user_id, seats):
+    """Hold every ``(flight_id, row, seat)`` for the user, or none.
+
+    Holds the user already has are extended. Returns the new expiry and
+    raises ``SeatConflict`` if a seat is sold or held by someone else.
+    """
+    seats = set(seats)
+    lookup = seats_lookup(seats)
+    sold = sold_seats(seats)
+    if sold:
+        raise SeatConflict({"seats": describe_seats(sold, "already taken")})
+
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.SEAT_HOLD_TTL)
+    # A hold locked by another transaction is being taken or sold right
+    # now. Skipping it instead of waiting lets the insert below fail on
+    # that seat at once, so competing buyers never queue on each other.
+    existing = (
+        SeatHold.objects
+        .select_for_update(skip_locked=True)
+        .filter(lookup)
+        .only("id", "flight_id", "row", "seat", "user_id", "expires_at")
+    )
+    reusable, held = {}, set()
+    for hold in existing:
+        key = (hold.flight_id, hold.row, hold.seat)
+        if hold.user_id == user_id or hold.expires_at <= now:
+            reusable[key] = hold.id
+        else:
+            held.add(key)
+    if held:
+        raise SeatConflict({
+            "seats": describe_seats(held, "held by another customer")
+        })
+
+    SeatHold.objects.filter(id__in=reusable.values()).update(
+        user_id=user_id, expires_at=expires_at
+    )
+    try:
+        with transaction.atomic():
+            SeatHold.objects.bulk_create([
+                SeatHold(
+                    flight_id=flight_id,
+                    row=row,
+                    seat=seat,
+                    user_id=user_id,
+                    expires_at=expires_at,
+                )
+                for flight_id, row, seat in seats - reusable.keys()
+            ])
+    except IntegrityError:
+        raise SeatConflict({
+            "seats": _unavailable_seats(seats, user_id, now)
+        })
+    return expires_at
+
+
+def claim_seats(user_id, seats):
+    """Free ``seats`` for the user to buy, dropping their holds on them.
+
+    Expired holds are dropped as well. Raises ``SeatConflict`` if another
+    customer still holds any of the seats. Call it inside the transaction
+    that sells the seats.
+    """
+    lookup = seats_lookup(seats)
+    now = timezone.now()
+    SeatHold.objects.filter(lookup).filter(
+        Q(user_id=user_id) | Q(expires_at__lte=now)
+    ).delete()
+    held = _held_by_others(lookup, user_id, now)
+    if held:
+        raise SeatConflict({
+            "tickets": describe_seats(held, "held by another customer")
+        })
@@ -0,0 +1,90 @@
+import logging
+import os.path
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from airport.models import Airplane
+
+logger = logging.getLogger(__name__)
+
+# File extension -> Pillow format of every variant.
+VARIANT_FORMATS = {
+    "webp": "WEBP",
+    "jpeg": "JPEG",
+}
+VARIANT_QUALITY = 80
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_PROCESSING_WORKERS,
+    thread_name_prefix="airplane-images",
+)
+
+
+def variant_path(image_name, variant, extension):
+    stem, _ = os.path.splitext(os.path.basename(image_name))
+    return os.path.join(
+        "uploads/airplanes/variants/", f"{stem}-{variant}.{extension}"
+    )
+
+
+def render_variants(image_name):
+    """Store resized copies of ``image_name``.
+
+    Returns ``{variant: {extension: storage path}}``. Images are never
+    scaled up, so a small upload gets variants of its own size.
+    """
+    with default_storage.open(image_name) as file:
+        with Image.open(file) as original:
+            image = ImageOps.exif_transpose(original)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    variants = {}
+    for variant, size in settings.AIRPLANE_IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        variants[variant] = {}
+        for extension, image_format in VARIANT_FORMATS.items():
+            if image_format == "JPEG" and resized.mode != "RGB":
+                resized = resized.convert("RGB")
+            buffer = BytesIO()
+            resized.save(buffer, image_format, quality=VARIANT_QUALITY)
+            variants[variant][extension] = default_storage.save(
+                variant_path(image_name, variant, extension),
+                ContentFile(buffer.getvalue()),
+            )
+    return variants
+
+
+def process_airplane_image(airplane_id, image_name):
+    variants = render_variants(image_name)
+    # Another upload may have replaced the image while this one was resized.
+    Airplane.objects.filter(pk=airplane_id, image=image_name).update(
+        image_variants=variants
+    )
+
+
+def _process_in_worker(airplane_id, image_name):
+    try:
+        process_airplane_image(airplane_id, image_name)
+    except Exception:
+        logger.exception(
+            "Could not resize the image of airplane %s", airplane_id
+        )
+    finally:
+        # Pool threads outlive requests, so nothing else closes these.
+        connections.close_all()
+
+
+def schedule_image_processing(airplane):
+    """Resize the airplane's image in the background once saved."""
+    airplane_id, image_name = airplane.id, airplane.image.name
+    transaction.on_commit(
+        lambda: executor.submit(_process_in_worker, airplane_id, image_name)
+    )
@@ -0,0 +1,72 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.synthetic import SCALES, USER_PASSWORD, email, generate
+
+COUNTS = (
+    "airports",
+    "routes",
+    "airplane_types",
+    "airplanes",
+    "crew",
+    "flights",
+    "users",
+    "tickets",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with deterministic synthetic airports, routes, "
+        "airplanes, crew, flights, users, orders and tickets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="small")
+        for name in COUNTS:
+            parser.add_argument(
+                f"--{name.replace('_', '-')}",
+                type=int,
+                help=f"Overrides the number of {name} of the scale",
+            )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--crew-per-flight", type=int, default=4)
+        parser.add_argument("--max-tickets-per-order", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        counts = dict(SCALES[options["scale"]])
+        for name in COUNTS:
+            if options[name] is not None:
+                counts[name] = options[name]
+        if counts["airports"] < 2:
+            raise CommandError("Routes need at least 2 airports")
+        if min(counts["airplanes"], counts["users"]) < 1:
+            raise CommandError("Flights and orders need airplanes and users")
+
+        seed = options["seed"]
+        if get_user_model().objects.filter(email=email(seed, 0)).exists():
+            raise CommandError(
+                f"Data for seed {seed} exists already; pick another --seed"
+            )
+
+        started = time.monotonic()
+        try:
+            created = generate(
+                seed=seed,
+                crew_per_flight=options["crew_per_flight"],
+                max_tickets_per_order=options["max_tickets_per_order"],
+                batch_size=options["batch_size"],
+                progress=self.stdout.write,
+                **counts,
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created['tickets']} ticket(s) in "
+            f"{time.monotonic() - started:.1f}s; users log in as "
+            f"{email(seed, 0)} ... with password {USER_PASSWORD!r}"
+        ))
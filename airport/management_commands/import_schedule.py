@@ -0,0 +1,349 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport.caching import bump_generation
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route,
+)
+from airport.routing import route_graph
+
+REQUIRED_COLUMNS = (
+    "source", "destination", "departure_time", "arrival_time", "airplane"
+)
+
+
+def read_schedule(path):
+    """Yield ``(line number, row)`` from a CSV or NDJSON file, lazily."""
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.suffix == ".csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError:
+                raise CommandError(f"Line {number}: invalid JSON")
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a flight schedule from a CSV or NDJSON file, creating or "
+        "updating airports, routes, airplanes, crew and flights in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", type=Path)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options["file"]
+        if path.suffix not in (".csv", ".ndjson", ".jsonl"):
+            raise CommandError("The file must be .csv, .ndjson or .jsonl")
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+
+        self.load_existing()
+        rows = read_schedule(path)
+        imported = 0
+        started = time.monotonic()
+
+        with transaction.atomic():
+            while batch := list(islice(rows, options["batch_size"])):
+                imported += self.import_batch(batch)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{imported} flights imported "
+                    f"({imported / elapsed:.0f}/s)"
+                )
+
+        for model in (Airport, AirplaneType, Crew, Route):
+            bump_generation(model)
+        route_graph.invalidate()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} flight(s) in "
+                f"{time.monotonic() - started:.1f}s"
+            )
+        )
+
+    def load_existing(self):
+        self.airports = {
+            airport.name: airport for airport in Airport.objects.all()
+        }
+        self.airplane_types = {
+            airplane_type.name: airplane_type
+            for airplane_type in AirplaneType.objects.all()
+        }
+        self.airplanes = {
+            airplane.name: airplane
+            for airplane in Airplane.objects.only(
+                "id", "name", "rows", "seats_in_rows", "airplane_type_id"
+            )
+        }
+        self.routes = {
+            (route.source_id, route.destination_id): route
+            for route in Route.objects.all()
+        }
+        self.crew = {
+            member.full_name.strip(): member for member in Crew.objects.all()
+        }
+
+    def import_batch(self, batch):
+        rows = [self.parse_row(number, row) for number, row in batch]
+
+        self.upsert_airports(rows)
+        self.upsert_airplanes(rows)
+        self.upsert_routes(rows)
+        self.create_crew(rows)
+
+        flights = {}
+        for row in rows:
+            airplane = self.airplanes[row["airplane"]]
+            flights[airplane.id, row["departure_time"]] = (row, Flight(
+                route=self.routes[
+                    self.airports[row["source"]].id,
+                    self.airports[row["destination"]].id,
+                ],
+                airplane=airplane,
+                departure_time=row["departure_time"],
+                arrival_time=row["arrival_time"],
+            ))
+        Flight.objects.bulk_create(
+            [flight for _, flight in flights.values()],
+            update_conflicts=True,
+            unique_fields=("airplane", "departure_time"),
+            update_fields=("route", "arrival_time", "updated_at"),
+        )
+        self.replace_crew(flights)
+        return len(flights)
+
+    def parse_row(self, number, row):
+        row = {
+            key: value for key, value in row.items()
+            if value not in (None, "")
+        }
+        missing = [column for column in REQUIRED_COLUMNS if column not in row]
+        if missing:
+            raise CommandError(
+                f"Line {number}: missing {', '.join(missing)}"
+            )
+
+        for column in ("departure_time", "arrival_time"):
+            value = parse_datetime(str(row[column]))
+            if value is None:
+                raise CommandError(
+                    f"Line {number}: {column} is not a valid datetime"
+                )
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            row[column] = value
+        if row["arrival_time"] <= row["departure_time"]:
+            raise CommandError(
+                f"Line {number}: arrival_time must be after departure_time"
+            )
+
+        for column in ("distance", "rows", "seats_in_rows"):
+            if column in row:
+                try:
+                    row[column] = int(row[column])
+                except ValueError:
+                    raise CommandError(
+                        f"Line {number}: {column} must be an integer"
+                    )
+
+        crew = row.get("crew")
+        if isinstance(crew, str):
+            row["crew"] = [
+                name.strip() for name in crew.split(";") if name.strip()
+            ]
+        row["number"] = number
+        return row
+
+    @staticmethod
+    def require(row, column, what):
+        if column not in row:
+            raise CommandError(
+                f"Line {row['number']}: {column} is required for new {what}"
+            )
+        return row[column]
+
+    def upsert_airports(self, rows):
+        new, changed = {}, {}
+        for row in rows:
+            for name_column, city_column in (
+                ("source", "source_city"),
+                ("destination", "destination_city"),
+            ):
+                name = row[name_column]
+                city = row.get(city_column)
+                airport = self.airports.get(name) or new.get(name)
+                if airport is None:
+                    new[name] = Airport(
+                        name=name,
+                        closest_big_city=self.require(
+                            row, city_column, f"airport {name}"
+                        ),
+                    )
+                elif city and airport.closest_big_city != city:
+                    airport.closest_big_city = city
+                    if airport.pk:
+                        changed[name] = airport
+
+        Airport.objects.bulk_create(new.values())
+        Airport.objects.bulk_update(changed.values(), ("closest_big_city",))
+        self.airports.update(new)
+
+    def upsert_airplanes(self, rows):
+        new_types = {}
+        for row in rows:
+            name = row.get("airplane_type")
+            if name and name not in self.airplane_types:
+                new_types[name] = AirplaneType(name=name)
+        AirplaneType.objects.bulk_create(new_types.values())
+        self.airplane_types.update(new_types)
+
+        new, changed = {}, {}
+        for row in rows:
+            name = row["airplane"]
+            airplane = self.airplanes.get(name) or new.get(name)
+            if airplane is None:
+                airplane_type = self.require(
+                    row, "airplane_type", f"airplane {name}"
+                )
+                new[name] = Airplane(
+                    name=name,
+                    rows=self.require(row, "rows", f"airplane {name}"),
+                    seats_in_rows=self.require(
+                        row, "seats_in_rows", f"airplane {name}"
+                    ),
+                    airplane_type=self.airplane_types[airplane_type],
+                )
+                continue
+
+            values = {
+                "rows": row.get("rows", airplane.rows),
+                "seats_in_rows": row.get(
+                    "seats_in_rows", airplane.seats_in_rows
+                ),
+                "airplane_type_id": (
+                    self.airplane_types[row["airplane_type"]].id
+                    if "airplane_type" in row
+                    else airplane.airplane_type_id
+                ),
+            }
+            if any(
+                getattr(airplane, field) != value
+                for field, value in values.items()
+            ):
+                for field, value in values.items():
+                    setattr(airplane, field, value)
+                if airplane.pk:
+                    changed[name] = airplane
+
+        Airplane.objects.bulk_create(new.values())
+        Airplane.objects.bulk_update(
+            changed.values(), ("rows", "seats_in_rows", "airplane_type")
+        )
+        # bulk_update() sends no post_save, so the flights of changed
+        # airplanes are touched here for their ETag and Last-Modified.
+        if changed:
+            Flight.objects.filter(airplane__in=changed.values()).update(
+                updated_at=timezone.now()
+            )
+        self.airplanes.update(new)
+
+    def upsert_routes(self, rows):
+        new, changed = {}, {}
+        for row in rows:
+            key = (
+                self.airports[row["source"]].id,
+                self.airports[row["destination"]].id,
+            )
+            distance = row.get("distance")
+            route = self.routes.get(key) or new.get(key)
+            if route is None:
+                new[key] = Route(
+                    source_id=key[0],
+                    destination_id=key[1],
+                    distance=self.require(
+                        row,
+                        "distance",
+                        f"route {row['source']} -> {row['destination']}"
+                    ),
+                )
+            elif distance is not None and route.distance != distance:
+                route.distance = distance
+                if route.pk:
+                    changed[key] = route
+
+        Route.objects.bulk_create(new.values())
+        Route.objects.bulk_update(changed.values(), ("distance",))
+        if changed:
+            Flight.objects.filter(route__in=changed.values()).update(
+                updated_at=timezone.now()
+            )
+        self.routes.update(new)
+
+    def create_crew(self, rows):
+        new = {}
+        for row in rows:
+            for name in row.get("crew", ()):
+                if name not in self.crew and name not in new:
+                    first_name, _, last_name = name.partition(" ")
+                    new[name] = Crew(
+                        first_name=first_name, last_name=last_name
+                    )
+        Crew.objects.bulk_create(new.values())
+        self.crew.update(new)
+
+    def replace_crew(self, flights):
+        """Set the crew of every flight whose row lists one."""
+        with_crew = {
+            key: row for key, (row, _) in flights.items() if "crew" in row
+        }
+        if not with_crew:
+            return
+
+        # Upserted rows do not get their ids back, so look them up.
+        ids = {
+            (airplane_id, departure_time): flight_id
+            for flight_id, airplane_id, departure_time in (
+                Flight.objects
+                .filter(
+                    airplane_id__in={key[0] for key in with_crew},
+                    departure_time__in={key[1] for key in with_crew},
+                )
+                .values_list("id", "airplane_id", "departure_time")
+            )
+        }
+        through = Flight.crew.through
+        through.objects.filter(
+            flight_id__in=[ids[key] for key in with_crew]
+        ).delete()
+        through.objects.bulk_create(
+            [
+                through(flight_id=ids[key], crew_id=self.crew[name].id)
+                for key, row in with_crew.items()
+                for name in row["crew"]
+            ],
+            ignore_conflicts=True,
+        )
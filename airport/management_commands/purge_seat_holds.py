@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from airport.models import SeatHold
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                # Holds locked right now are being renewed or sold.
+                ids = list(
+                    SeatHold.objects
+                    .filter(expires_at__lte=now)
+                    .select_for_update(skip_locked=True)
+                    .values_list("id", flat=True)[:options["batch_size"]]
+                )
+                if not ids:
+                    break
+                count, _ = SeatHold.objects.filter(id__in=ids).delete()
+            deleted += count
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired seat hold(s)")
+        )
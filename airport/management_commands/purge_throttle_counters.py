@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from airport.models import ThrottleCounter
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class Command(BaseCommand):
+    help = "Delete throttle counters that no rate limit looks at anymore."
+
+    def handle(self, *args, **options):
+        rates = settings.REST_FRAMEWORK.get("DEFAULT_THROTTLE_RATES", {})
+        durations = [
+            DURATIONS[rate.split("/")[1][0]]
+            for rate in rates.values()
+            if rate
+        ]
+        # The sliding window reads the current and the previous window.
+        oldest = time.time() - 2 * max(durations, default=0)
+
+        deleted, _ = ThrottleCounter.objects.filter(
+            window_start__lt=oldest
+        ).delete()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} throttle counter(s)")
+        )
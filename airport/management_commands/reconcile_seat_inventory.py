@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.core.management.base import BaseCommand
+
+from airport.models import Flight, Ticket
+
+
+class Command(BaseCommand):
+    help = "Recount Flight.tickets_sold from the tickets table."
+
+    def handle(self, *args, **options):
+        sold = (
+            Ticket.objects
+            .filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        actual = Coalesce(Subquery(sold), 0)
+
+        with transaction.atomic():
+            updated = (
+                Flight.objects
+                .exclude(tickets_sold=actual)
+                .update(tickets_sold=actual)
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled seat inventory of "
+                               f"{updated} flight(s)")
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.routing import route_graph
+
+
+class Command(BaseCommand):
+    help = ("Print the shortest route distance between two airports, "
+            "or between every connected pair as CSV.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", type=int)
+        parser.add_argument("--destination", type=int)
+
+    def handle(self, *args, **options):
+        source = options["source"]
+        destination = options["destination"]
+
+        if (source is None) != (destination is None):
+            raise CommandError(
+                "--source and --destination must be given together"
+            )
+
+        if source is not None:
+            shortest = route_graph.shortest_path(source, destination)
+            if shortest is None:
+                raise CommandError("No route connects these airports")
+            distance, airports = shortest
+            self.stdout.write(
+                f"{distance} via {' -> '.join(map(str, airports))}"
+            )
+            return
+
+        self.stdout.write("source,destination,distance")
+        for source in route_graph.airport_ids():
+            distances, _ = route_graph.shortest_distances(source)
+            for destination, distance in sorted(distances.items()):
+                if destination != source:
+                    self.stdout.write(f"{source},{destination},{distance}")
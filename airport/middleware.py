@@ -0,0 +1,118 @@
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from airport import profiling
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """``connection.execute_wrapper`` hook that counts executed queries."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMiddleware:
+    """Check every request against ``settings.QUERY_BUDGETS``.
+
+    Budgets are keyed by URL name, e.g. ``"airport:route-list"``. A request
+    that runs more queries than its budget is logged, or raises
+    ``QueryBudgetExceeded`` when ``QUERY_BUDGET_RAISE`` is set.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        budget = (
+            settings.QUERY_BUDGETS.get(match.view_name) if match else None
+        )
+        if budget is not None and counter.count > budget:
+            message = (f"{request.method} {request.path} ran "
+                       f"{counter.count} queries, budget is {budget}")
+            if settings.QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+
+class ProfilingMiddleware:
+    """Profile a ``PROFILING_SAMPLE_RATE`` fraction of requests.
+
+    A sampled request records its SQL query count and time, the time spent
+    in serializers and in rendering, and the response size under its view
+    and action, e.g. ``FlightViewSet.list``. The same numbers are sent back
+    in a ``Server-Timing`` header. Other requests are not instrumented.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        profiling.instrument_serializers()
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        profile = profiling.RequestProfile()
+        request._profile_render_started = None
+        token = profile.activate()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(profile):
+                response = self.get_response(request)
+        finally:
+            profile.deactivate(token)
+        finished = time.perf_counter()
+
+        values = {
+            "total_ms": (finished - started) * 1000,
+            "db_ms": profile.db_time * 1000,
+            "serializer_ms": profile.serializer_time * 1000,
+            "queries": profile.queries,
+        }
+        if request._profile_render_started is not None:
+            values["render_ms"] = (
+                finished - request._profile_render_started
+            ) * 1000
+        if not response.streaming:
+            values["response_bytes"] = len(response.content)
+
+        view = profiling.view_name(request)
+        if view is not None:
+            profiling.record(view, values)
+        response["Server-Timing"] = ", ".join(
+            [
+                f"{metric[:-3]};dur={values[metric]:.1f}"
+                for metric in (
+                    "db_ms", "serializer_ms", "render_ms", "total_ms"
+                )
+                if metric in values
+            ]
+            + [f'queries;desc="{profile.queries}"']
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before the response is rendered.
+        if hasattr(request, "_profile_render_started"):
+            request._profile_render_started = time.perf_counter()
+        return response
@@ -0,0 +1,62 @@
+# Generated by Django 4.2 on 2026-10-18 02:05
+
+import airport.models
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def count_sold_tickets(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+    sold = (
+        Ticket.objects
+        .filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Flight.objects.update(
+        tickets_sold=Coalesce(Subquery(sold), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='ticket',
+            options={'ordering': ('row',)},
+        ),
+        migrations.AddField(
+            model_name='airplane',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to=airport.models.airplane_image_file_path),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='tickets_sold',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='flight',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='airport.flight'),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='airport.order'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ticket',
+            unique_together={('seat', 'row', 'flight')},
+        ),
+        migrations.RunPython(count_sold_tickets, migrations.RunPython.noop),
+    ]
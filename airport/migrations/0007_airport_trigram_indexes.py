@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 02:09
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0006_flight_route_departure_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='airport',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='airport_name_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='airport',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('closest_big_city'), name='gin_trgm_ops'), name='airport_city_trgm_idx'),
+        ),
+    ]
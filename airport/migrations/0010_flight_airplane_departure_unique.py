@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-18 02:34
+
+from django.db import IntegrityError, migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_departures(apps, schema_editor):
+    """Name the flights that would break the constraint, if any."""
+    Flight = apps.get_model("airport", "Flight")
+    duplicates = list(
+        Flight.objects
+        .values("airplane_id", "departure_time")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by("airplane_id", "departure_time")[:20]
+    )
+    if duplicates:
+        raise IntegrityError(
+            "Some airplanes have several flights departing at the same "
+            "time. Delete or reschedule them before migrating:\n"
+            + "\n".join(
+                f"  airplane {row['airplane_id']} at "
+                f"{row['departure_time'].isoformat()}: {row['count']} flights"
+                for row in duplicates
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0009_throttlecounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            check_duplicate_departures, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='flight',
+            constraint=models.UniqueConstraint(fields=('airplane', 'departure_time'), name='flight_airplane_departure_unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0010_flight_airplane_departure_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airplane',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,8 +1,12 @@
 import os.path
 import uuid
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
+from django.utils import timezone
 from django.utils.text import slugify
 
 
@@ -10,17 +14,39 @@ class Airport(models.Model):
     name = models.CharField(max_length=255)
     closest_big_city = models.CharField(max_length=255)
 
+    class Meta:
+        # Trigram indexes over UPPER(...) serve Django's icontains lookups.
+        indexes = [
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="airport_name_trgm_idx"
+            ),
+            GinIndex(
+                OpClass(Upper("closest_big_city"), name="gin_trgm_ops"),
+                name="airport_city_trgm_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=("user", "updated_at"),
+                name="order_user_updated_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Created at {self.created_at} by {self.user}"
 
@@ -81,6 +107,8 @@ class Airplane(models.Model):
         upload_to=airplane_image_file_path,
         blank=True
     )
+    # Filled in the background by airport.images once an upload is resized.
+    image_variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return (f"{self.name} is {self.airplane_type} type and has"
@@ -91,6 +119,16 @@ class Airplane(models.Model):
         return f"{self.rows * self.seats_in_rows}"
 
 
+class FlightQuerySet(models.QuerySet):
+    def with_tickets_available(self):
+        return self.annotate(
+            tickets_available=(
+                F("airplane__rows") * F("airplane__seats_in_rows")
+                - F("tickets_sold")
+            )
+        )
+
+
 class Flight(models.Model):
     route = models.ForeignKey(
         Route,
@@ -105,11 +143,58 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flight")
+    tickets_sold = models.IntegerField(default=0, editable=False)
+    seats_version = models.IntegerField(default=0, editable=False)
+    seats_released_version = models.IntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = FlightQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=("departure_time", "id"),
+                name="flight_departure_id_idx"
+            ),
+            models.Index(
+                fields=("route", "departure_time"),
+                name="flight_route_departure_idx"
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("airplane", "departure_time"),
+                name="flight_airplane_departure_unique"
+            ),
+        ]
 
     def __str__(self):
         return (f"Flight from {self.route.source} to {self.route.destination}"
                 f"estimated time of arrival {self.arrival_time}")
 
+    @staticmethod
+    def sell_seats(flight_id, count):
+        """Count sold seats and return the new seat map version."""
+        Flight.objects.filter(pk=flight_id).update(
+            tickets_sold=F("tickets_sold") + count,
+            seats_version=F("seats_version") + 1,
+            updated_at=timezone.now(),
+        )
+        return (
+            Flight.objects
+            .values_list("seats_version", flat=True)
+            .get(pk=flight_id)
+        )
+
+    @staticmethod
+    def release_seats(flight_id, count):
+        Flight.objects.filter(pk=flight_id).update(
+            tickets_sold=F("tickets_sold") - count,
+            seats_version=F("seats_version") + 1,
+            seats_released_version=F("seats_version") + 1,
+            updated_at=timezone.now(),
+        )
+
 
 class Ticket(models.Model):
     row = models.IntegerField()
@@ -124,6 +209,7 @@ class Ticket(models.Model):
         on_delete=models.CASCADE,
         related_name="tickets"
     )
+    version = models.IntegerField(default=0, editable=False)
 
     class Meta:
         unique_together = ("seat", "row", "flight")
@@ -151,3 +237,55 @@ class Ticket(models.Model):
             self.flight.airplane.rows,
             ValidationError
         )
+
+
+class SeatHold(models.Model):
+    """A seat set aside for one user until ``expires_at``."""
+
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("flight", "row", "seat"),
+                name="seat_hold_seat_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=("expires_at",), name="seat_hold_expires_idx"),
+        ]
+
+    def __str__(self):
+        return (f"{self.flight_id} {self.seat} {self.row} "
+                f"held until {self.expires_at}")
+
+
+class ThrottleCounter(models.Model):
+    """Requests counted for one throttle key in one fixed window."""
+
+    key = models.CharField(max_length=255)
+    window_start = models.BigIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("key", "window_start"),
+                name="throttle_counter_window_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.key} @ {self.window_start}: {self.count}"
@@ -0,0 +1,184 @@
+"""Sampled request profiles, aggregated into histograms in the cache.
+
+``airport.middleware.ProfilingMiddleware`` fills a ``RequestProfile`` for a
+sampled fraction of requests and passes it to ``record``. Counters live
+in the shared cache, so every worker adds to the same histograms.
+"""
+import contextvars
+import time
+
+from django.core.cache import cache
+from rest_framework import serializers
+
+# Upper bounds of the histogram buckets; larger values go to "+Inf".
+BUCKETS = {
+    "total_ms": (5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+    "db_ms": (1, 5, 10, 25, 50, 100, 250, 1000),
+    "serializer_ms": (1, 5, 10, 25, 50, 100, 250, 1000),
+    "render_ms": (1, 5, 10, 25, 50, 100, 250),
+    "queries": (1, 2, 3, 5, 8, 13, 21, 34, 55),
+    "response_bytes": (1024, 4096, 16384, 65536, 262144, 1048576),
+}
+# Milliseconds are summed as whole microseconds, since cache.incr only
+# takes integers.
+SCALE = {
+    "total_ms": 1000,
+    "db_ms": 1000,
+    "serializer_ms": 1000,
+    "render_ms": 1000,
+    "queries": 1,
+    "response_bytes": 1,
+}
+
+VIEWS_KEY = "airport:profile:views"
+
+_active = contextvars.ContextVar("airport_profile", default=None)
+
+
+class RequestProfile:
+    """Counters of one request; also its ``execute_wrapper`` hook."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def activate(self):
+        return _active.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _active.reset(token)
+
+
+def _timed_data(data):
+    def timed(serializer):
+        profile = _active.get()
+        if profile is None or profile.serializing:
+            return data.fget(serializer)
+        # Only the outermost serializer is timed; nested ones are part
+        # of it. Queries of lazy querysets count as serializer time too.
+        profile.serializing = True
+        started = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            profile.serializing = False
+            profile.serializer_time += time.perf_counter() - started
+
+    timed.profiled = True
+    return property(timed, doc=data.__doc__)
+
+
+def instrument_serializers():
+    """Time ``serializer.data`` of every DRF serializer while profiling."""
+    for serializer_class in (
+        serializers.Serializer, serializers.ListSerializer
+    ):
+        data = serializer_class.data
+        if not getattr(data.fget, "profiled", False):
+            serializer_class.data = _timed_data(data)
+
+
+def view_name(request):
+    """``"FlightViewSet.list"`` style name of the view that answered."""
+    match = request.resolver_match
+    if match is None:
+        return None
+    view_class = getattr(match.func, "cls", None) or getattr(
+        match.func, "view_class", None
+    )
+    if view_class is None:
+        return match.view_name
+    actions = getattr(match.func, "actions", None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f"{view_class.__name__}.{action}"
+
+
+def _key(view, metric, part):
+    return f"airport:profile:{view}:{metric}:{part}"
+
+
+def _bucket(metric, value):
+    for bound in BUCKETS[metric]:
+        if value <= bound:
+            return str(bound)
+    return "+Inf"
+
+
+def _incr(key, delta=1):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def record(view, values):
+    """Add one request's ``{metric: value}`` to the histograms of ``view``."""
+    views = cache.get(VIEWS_KEY, set())
+    if view not in views:
+        cache.set(VIEWS_KEY, views | {view}, None)
+    _incr(_key(view, "requests", "count"))
+    for metric, value in values.items():
+        _incr(_key(view, metric, _bucket(metric, value)))
+        _incr(_key(view, metric, "sum"), round(value * SCALE[metric]))
+
+
+def histograms():
+    """Every view's histograms, the views with the most total time first."""
+    views = sorted(cache.get(VIEWS_KEY, set()))
+    keys = [_key(view, "requests", "count") for view in views] + [
+        _key(view, metric, part)
+        for view in views
+        for metric, bounds in BUCKETS.items()
+        for part in (*map(str, bounds), "+Inf", "sum")
+    ]
+    counters = cache.get_many(keys)
+
+    result = []
+    for view in views:
+        count = counters.get(_key(view, "requests", "count"), 0)
+        if not count:
+            continue
+        entry = {"view": view, "requests": count}
+        for metric, bounds in BUCKETS.items():
+            buckets = [
+                {
+                    "le": bound,
+                    "count": counters.get(_key(view, metric, bound), 0),
+                }
+                for bound in (*map(str, bounds), "+Inf")
+            ]
+            # Streamed responses have no size and only DRF responses have
+            # a render time, so a metric may count fewer requests.
+            measured = sum(bucket["count"] for bucket in buckets)
+            total = counters.get(_key(view, metric, "sum"), 0) / SCALE[metric]
+            entry[metric] = {
+                "sum": round(total, 3),
+                "mean": round(total / measured, 3) if measured else None,
+                "buckets": buckets,
+            }
+        result.append(entry)
+    result.sort(key=lambda entry: entry["total_ms"]["sum"], reverse=True)
+    return result
+
+
+def reset():
+    views = cache.get(VIEWS_KEY, set())
+    cache.delete_many([
+        _key(view, metric, part)
+        for view in views
+        for metric, bounds in (("requests", ()), *BUCKETS.items())
+        for part in (*map(str, bounds), "+Inf", "sum", "count")
+    ])
+    cache.delete(VIEWS_KEY)
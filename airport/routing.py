@@ -0,0 +1,279 @@
+import bisect
+import heapq
+import itertools
+import math
+import threading
+import uuid
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+
+from airport.models import Flight, Route
+
+ROUTE_GRAPH_VERSION_KEY = "airport:route-graph-counter"
+# Source airports whose shortest distances are kept, least recently used
+# first out.
+SHORTEST_DISTANCES_CACHED = 256
+
+
+class RouteGraph:
+    """In-memory adjacency index of routes.
+
+    The index is loaded lazily and then updated route by route from the
+    Route signals. Every change also increments a version counter in the
+    cache, so other processes sharing that cache notice and reload; a
+    process that finds the counter moved by someone else reloads too.
+    Shortest distances are computed per source airport on first use and
+    kept, for the most recently used sources, until the graph changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._edges = None
+        self._sources = {}
+        self._version = None
+        self._shortest = OrderedDict()
+
+    def reset(self):
+        with self._lock:
+            self._edges = None
+            self._sources = {}
+            self._version = None
+            self._shortest = OrderedDict()
+
+    def invalidate(self):
+        """Reload on next use, here and in every process sharing the cache."""
+        with self._lock:
+            self._edges = None
+            self._bump_version()
+
+    def _load(self):
+        edges = defaultdict(dict)
+        sources = {}
+        routes = Route.objects.values_list(
+            "id", "source_id", "destination_id", "distance"
+        )
+        for route_id, source_id, destination_id, distance in routes:
+            edges[source_id][route_id] = (destination_id, distance)
+            sources[route_id] = source_id
+        self._edges = edges
+        self._sources = sources
+        self._shortest = OrderedDict()
+
+    def _ensure_current(self):
+        version = cache.get(ROUTE_GRAPH_VERSION_KEY)
+        with self._lock:
+            if version is None:
+                version = self._start_version()
+                self._edges = None
+            if self._edges is None or version != self._version:
+                self._load()
+                self._version = version
+            return self._edges
+
+    @staticmethod
+    def _start_version():
+        # A random start keeps a counter restarted after eviction from
+        # matching a version some process loaded before.
+        version = uuid.uuid4().int >> 80
+        if cache.add(ROUTE_GRAPH_VERSION_KEY, version, None):
+            return version
+        return cache.get(ROUTE_GRAPH_VERSION_KEY)
+
+    def _bump_version(self):
+        """Count a change made to the graph of this process."""
+        self._shortest = OrderedDict()
+        try:
+            version = cache.incr(ROUTE_GRAPH_VERSION_KEY)
+        except ValueError:
+            version = self._start_version()
+        if self._version is None or version != self._version + 1:
+            # Evicted, or another process changed the graph since it was
+            # loaded here, so the in-place update is not enough.
+            self._edges = None
+        self._version = version
+
+    def _discard(self, route_id):
+        source_id = self._sources.pop(route_id, None)
+        if source_id is not None:
+            self._edges[source_id].pop(route_id, None)
+
+    def route_saved(self, route_id, source_id, destination_id, distance):
+        with self._lock:
+            if self._edges is not None:
+                self._discard(route_id)
+                self._edges[source_id][route_id] = (destination_id, distance)
+                self._sources[route_id] = source_id
+            self._bump_version()
+
+    def route_deleted(self, route_id):
+        with self._lock:
+            if self._edges is not None:
+                self._discard(route_id)
+            self._bump_version()
+
+    def paths(self, source_id, destination_id, max_legs):
+        """Route id sequences from source to destination without loops."""
+        with self._lock:
+            edges = self._ensure_current()
+            found = []
+            stack = [(source_id, [], {source_id})]
+            while stack:
+                airport_id, path, visited = stack.pop()
+                for route_id, (next_id, _) in edges.get(
+                    airport_id, {}
+                ).items():
+                    if next_id == destination_id:
+                        found.append(path + [route_id])
+                    elif next_id not in visited and len(path) + 1 < max_legs:
+                        stack.append(
+                            (next_id, path + [route_id], visited | {next_id})
+                        )
+            return found
+
+    def airport_ids(self):
+        with self._lock:
+            edges = self._ensure_current()
+            return sorted(
+                set(edges)
+                | {
+                    destination_id
+                    for routes in edges.values()
+                    for destination_id, _ in routes.values()
+                }
+            )
+
+    def _dijkstra(self, edges, source_id):
+        distances = {source_id: 0}
+        previous = {}
+        queue = [(0, source_id)]
+        while queue:
+            distance, airport_id = heapq.heappop(queue)
+            if distance > distances[airport_id]:
+                continue
+            for next_id, length in edges.get(airport_id, {}).values():
+                candidate = distance + length
+                if candidate < distances.get(next_id, math.inf):
+                    distances[next_id] = candidate
+                    previous[next_id] = airport_id
+                    heapq.heappush(queue, (candidate, next_id))
+        return distances, previous
+
+    def shortest_distances(self, source_id):
+        """``(distances, previous)`` maps for every airport reachable."""
+        with self._lock:
+            edges = self._ensure_current()
+            if source_id in self._shortest:
+                self._shortest.move_to_end(source_id)
+            else:
+                self._shortest[source_id] = self._dijkstra(edges, source_id)
+                if len(self._shortest) > SHORTEST_DISTANCES_CACHED:
+                    self._shortest.popitem(last=False)
+            return self._shortest[source_id]
+
+    def shortest_path(self, source_id, destination_id):
+        """``(distance, airport ids)`` of the shortest path, or None."""
+        distances, previous = self.shortest_distances(source_id)
+        if destination_id not in distances:
+            return None
+        airports = [destination_id]
+        while airports[-1] != source_id:
+            airports.append(previous[airports[-1]])
+        return distances[destination_id], airports[::-1]
+
+
+route_graph = RouteGraph()
+
+
+def find_itineraries(
+    source_id,
+    destination_id,
+    departure_from,
+    departure_to,
+    max_legs=2,
+    min_connection=timedelta(hours=1),
+    max_connection=timedelta(hours=24),
+    seats=1,
+    limit=20,
+):
+    """Chain real flights along the route graph.
+
+    The first leg departs in ``[departure_from, departure_to)``; every next
+    leg departs between ``min_connection`` and ``max_connection`` after the
+    previous arrival. Flights for all candidate routes are loaded in one
+    query, assuming no single leg takes longer than a day.
+    """
+    paths = route_graph.paths(source_id, destination_id, max_legs)
+    if not paths:
+        return []
+
+    route_ids = {route_id for path in paths for route_id in path}
+    latest_departure = departure_to + (max_legs - 1) * (
+        max_connection + timedelta(days=1)
+    )
+    flights = (
+        Flight.objects
+        .filter(
+            route_id__in=route_ids,
+            departure_time__gte=departure_from,
+            departure_time__lt=latest_departure,
+        )
+        .with_tickets_available()
+        .filter(tickets_available__gte=seats)
+        .select_related(
+            "airplane__airplane_type",
+            "route__source",
+            "route__destination"
+        )
+        .prefetch_related("crew")
+        .order_by("departure_time", "id")
+    )
+    by_route = defaultdict(list)
+    for flight in flights:
+        by_route[flight.route_id].append(flight)
+    departures = {
+        route_id: [flight.departure_time for flight in route_flights]
+        for route_id, route_flights in by_route.items()
+    }
+
+    # The best itineraries so far as sorted (key, number, legs), at most
+    # ``limit`` of them; the number keeps ties in the order found.
+    best = []
+    numbers = itertools.count()
+
+    def extend(path, legs):
+        if len(legs) == len(path):
+            key = (legs[-1].arrival_time, len(legs), legs[0].departure_time)
+            bisect.insort(best, (key, next(numbers), legs))
+            if len(best) > limit:
+                best.pop()
+            return
+        route_id = path[len(legs)]
+        route_flights = by_route.get(route_id, [])
+        if legs:
+            earliest = legs[-1].arrival_time + min_connection
+            latest = legs[-1].arrival_time + max_connection
+        else:
+            earliest, latest = departure_from, departure_to
+        start = bisect.bisect_left(departures.get(route_id, []), earliest)
+        for flight in route_flights[start:]:
+            if legs and flight.departure_time > latest:
+                break
+            if not legs and flight.departure_time >= latest:
+                break
+            # Every further leg arrives later still, so once ``limit``
+            # itineraries are found nothing arriving after the last one
+            # can make it. Flights are in departure order.
+            if best and len(best) >= limit:
+                cutoff = best[-1][0][0]
+                if flight.departure_time > cutoff:
+                    break
+                if flight.arrival_time > cutoff:
+                    continue
+            extend(path, legs + [flight])
+
+    for path in paths:
+        extend(path, [])
+
+    return [legs for _, _, legs in best]
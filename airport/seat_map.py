@@ -0,0 +1,18 @@
+import base64
+
+
+def pack_occupied_seats(seats, rows, seats_in_rows):
+    """Pack (row, seat) pairs into a base64 bitmap.
+
+    Seat ``(row, seat)`` is bit ``(row - 1) * seats_in_rows + (seat - 1)``,
+    counted from the most significant bit of the first byte. Seats outside
+    the layout are left out: tickets sold before the airplane was made
+    smaller have no bit of their own.
+    """
+    bitmap = bytearray((rows * seats_in_rows + 7) // 8)
+    for row, seat in seats:
+        if not (1 <= row <= rows and 1 <= seat <= seats_in_rows):
+            continue
+        index = (row - 1) * seats_in_rows + (seat - 1)
+        bitmap[index // 8] |= 0x80 >> (index % 8)
+    return base64.b64encode(bytes(bitmap)).decode("ascii")
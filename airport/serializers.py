@@ -1,6 +1,18 @@
-from django.db import transaction
-from rest_framework import serializers
+from collections import Counter
 
+from django.core.files.storage import default_storage
+from django.db import transaction, IntegrityError
+from drf_spectacular.utils import extend_schema_field
+from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
+
+from airport.holds import (
+    SeatConflict,
+    claim_seats,
+    describe_seats,
+    hold_seats,
+    sold_seats,
+)
 from airport.models import (
     Airport,
     Order,
@@ -61,20 +73,41 @@ class AirplaneSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "rows", "seats_in_rows", "airplane_type")
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    """``{variant: {format: url}}`` of the resized copies of an image."""
+
+    def to_representation(self, variants):
+        request = self.context.get("request")
+        urls = {}
+        for variant, paths in variants.items():
+            urls[variant] = {}
+            for extension, path in paths.items():
+                url = default_storage.url(path)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls[variant][extension] = url
+        return urls
+
+
 class AirplaneListSerializer(AirplaneSerializer):
     airplane_type = serializers.SlugRelatedField(
         slug_field="name",
         many=False,
         read_only=True
     )
+    image_variants = ImageVariantsField()
+
+    class Meta(AirplaneSerializer.Meta):
+        fields = AirplaneSerializer.Meta.fields + ("image", "image_variants")
 
 
 class AirplaneImageSerializer(serializers.ModelSerializer):
     image = serializers.ImageField()
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Airplane
-        fields = ("id", "image",)
+        fields = ("id", "image", "image_variants")
 
 
 class FlightSerializer(serializers.ModelSerializer):
@@ -84,9 +117,85 @@ class FlightSerializer(serializers.ModelSerializer):
             "id", "route", "airplane",
             "departure_time", "arrival_time", "crew"
         )
+        # DRF does not derive validators from UniqueConstraint.
+        validators = [
+            UniqueTogetherValidator(
+                queryset=Flight.objects.all(),
+                fields=("airplane", "departure_time"),
+                message="This airplane already departs at this time.",
+            ),
+        ]
+
+
+def _repeated_seats(seats):
+    """Describe every (flight_id, row, seat) requested more than once."""
+    errors = []
+    requested = set()
+    for key in seats:
+        flight_id, row, seat = key
+        if key in requested:
+            errors.append(
+                f"seat {seat} in row {row} "
+                f"is requested more than once on flight {flight_id}"
+            )
+        requested.add(key)
+    return errors
+
+
+class PreloadedFlightField(serializers.PrimaryKeyRelatedField):
+    """Resolve flights from the batch loaded by ``TicketBatchSerializer``."""
+
+    def to_internal_value(self, data):
+        flights = getattr(self.parent, "preloaded_flights", None)
+        if flights is not None and not isinstance(data, bool):
+            try:
+                flight = flights.get(int(data))
+            except (TypeError, ValueError):
+                flight = None
+            if flight is not None:
+                return flight
+        return super().to_internal_value(data)
+
+
+class TicketBatchSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            flight_ids = set()
+            for item in data:
+                try:
+                    flight_ids.add(int(item["flight"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            self.child.preloaded_flights = (
+                Flight.objects
+                .select_related("airplane")
+                .in_bulk(flight_ids)
+            )
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        seats = [
+            (ticket["flight"].id, ticket["row"], ticket["seat"])
+            for ticket in attrs
+        ]
+        errors = _repeated_seats(seats)
+        if errors:
+            raise serializers.ValidationError(errors)
+        # A seat sold earlier is the same conflict as one sold while this
+        # order is placed, so both are answered with 409.
+        taken = sold_seats(seats)
+        if taken:
+            raise SeatConflict({
+                "tickets": describe_seats(taken, "already taken")
+            })
+        return attrs
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    flight = PreloadedFlightField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs)
         Ticket.validate_seat(
@@ -101,6 +210,10 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "flight")
+        # Seat uniqueness is checked for the whole batch in
+        # TicketBatchSerializer instead of one query per ticket.
+        validators = []
+        list_serializer_class = TicketBatchSerializer
 
 
 class TicketFlightSerializer(TicketSerializer):
@@ -156,18 +269,77 @@ class FlightDetailSerializer(FlightSerializer):
         many=True,
         read_only=True
     )
+    tickets_available = serializers.IntegerField(read_only=True)
     tickets = TicketFlightSerializer(many=True, read_only=True)
 
     class Meta:
         model = Flight
         fields = (
             "id", "route", "airplane", "departure_time",
-            "arrival_time", "crew", "tickets"
+            "arrival_time", "crew", "tickets_available", "tickets"
         )
 
 
-class TicketListSerializer(TicketSerializer):
-    flight = FlightListSerializer(many=False, read_only=True)
+class AsyncFlightListSerializer(FlightListSerializer):
+    """Reads crew names loaded up front instead of the crew relation."""
+
+    crew = serializers.ListField(
+        source="crew_names",
+        child=serializers.CharField(),
+        read_only=True
+    )
+
+
+class AsyncFlightDetailSerializer(FlightDetailSerializer):
+    crew = serializers.ListField(
+        source="crew_names",
+        child=serializers.CharField(),
+        read_only=True
+    )
+    tickets = TicketFlightSerializer(
+        source="ticket_list",
+        many=True,
+        read_only=True
+    )
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    """Seats of the flight in ``context["flight"]`` to hold."""
+
+    seats = SeatSerializer(many=True, allow_empty=False)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def validate_seats(self, seats):
+        airplane = self.context["flight"].airplane
+        for seat in seats:
+            Ticket.validate_seat(
+                seat["seat"],
+                airplane.seats_in_rows,
+                seat["row"],
+                airplane.rows,
+                serializers.ValidationError
+            )
+        return seats
+
+    def create(self, validated_data):
+        flight = self.context["flight"]
+        expires_at = hold_seats(validated_data["user_id"], [
+            (flight.id, seat["row"], seat["seat"])
+            for seat in validated_data["seats"]
+        ])
+        return {"seats": validated_data["seats"], "expires_at": expires_at}
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    distance = serializers.IntegerField(read_only=True)
+    legs = FlightListSerializer(many=True, read_only=True)
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -181,10 +353,56 @@ class OrderSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         tickets_data = validated_data.pop("tickets")
         order = Order.objects.create(**validated_data)
-        for ticket_data in tickets_data:
-            Ticket.objects.create(order=order, **ticket_data)
+        # Give up before the flight rows are locked to count the sale if
+        # someone else holds a seat.
+        claim_seats(order.user_id, [
+            (ticket_data["flight"].id, ticket_data["row"], ticket_data["seat"])
+            for ticket_data in tickets_data
+        ])
+        sold = Counter(
+            ticket_data["flight"].id for ticket_data in tickets_data
+        )
+        versions = {
+            flight_id: Flight.sell_seats(flight_id, count)
+            for flight_id, count in sorted(sold.items())
+        }
+        tickets = [
+            Ticket(
+                order=order,
+                version=versions[ticket_data["flight"].id],
+                **ticket_data
+            )
+            for ticket_data in tickets_data
+        ]
+        try:
+            with transaction.atomic():
+                Ticket.objects.bulk_create(tickets)
+        except IntegrityError:
+            seats = [
+                (ticket.flight.id, ticket.row, ticket.seat)
+                for ticket in tickets
+            ]
+            raise SeatConflict({
+                "tickets": describe_seats(
+                    sold_seats(seats) or seats, "already taken"
+                )
+            })
         return order
 
 
 class OrderListSerializer(OrderSerializer):
-    tickets = TicketListSerializer(read_only=True, many=True)
+    """Tickets refer to flights by id; each flight is listed once."""
+
+    tickets = TicketSerializer(read_only=True, many=True)
+    flights = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = ("id", "created_at", "tickets", "flights")
+
+    @extend_schema_field(FlightListSerializer(many=True))
+    def get_flights(self, order):
+        flights = {
+            ticket.flight_id: ticket.flight for ticket in order.tickets.all()
+        }
+        return FlightListSerializer(flights.values(), many=True).data
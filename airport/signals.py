@@ -0,0 +1,129 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from airport.caching import bump_generation
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.routing import route_graph
+
+
+def _touch_order(order_id):
+    Order.objects.filter(pk=order_id).update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=Ticket)
+def move_ticket(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        return
+    previous = (
+        Ticket.objects
+        .filter(pk=instance.pk)
+        .values_list("flight_id", "row", "seat")
+        .first()
+    )
+    if previous not in (
+        None, (instance.flight_id, instance.row, instance.seat)
+    ):
+        Flight.release_seats(previous[0], 1)
+        instance.version = Flight.sell_seats(instance.flight_id, 1)
+
+
+@receiver(post_save, sender=Ticket)
+def count_saved_ticket(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        instance.version = Flight.sell_seats(instance.flight_id, 1)
+        Ticket.objects.filter(pk=instance.pk).update(version=instance.version)
+    _touch_order(instance.order_id)
+
+
+@receiver(post_delete, sender=Ticket)
+def count_deleted_ticket(sender, instance, **kwargs):
+    Flight.release_seats(instance.flight_id, 1)
+    _touch_order(instance.order_id)
+
+
+FLIGHT_LOOKUPS = {
+    Route: ("route",),
+    Airport: ("route__source", "route__destination"),
+    Airplane: ("airplane",),
+    AirplaneType: ("airplane__airplane_type",),
+    Crew: ("crew",),
+}
+
+
+def touch_dependent_flights(sender, instance, raw=False, **kwargs):
+    """Bump ``Flight.updated_at`` when data shown with a flight changes."""
+    if raw:
+        return
+    lookup = Q()
+    for field in FLIGHT_LOOKUPS[sender]:
+        lookup |= Q(**{field: instance})
+    Flight.objects.filter(lookup).update(updated_at=timezone.now())
+
+
+for model in FLIGHT_LOOKUPS:
+    post_save.connect(touch_dependent_flights, sender=model)
+pre_delete.connect(touch_dependent_flights, sender=Crew)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def touch_flights_on_crew_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        flights = Flight.objects.filter(pk=instance.pk)
+    elif action == "pre_clear":
+        flights = Flight.objects.filter(crew=instance)
+    else:
+        flights = Flight.objects.filter(pk__in=pk_set)
+    flights.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Route)
+def index_saved_route(sender, instance, **kwargs):
+    transaction.on_commit(lambda: route_graph.route_saved(
+        instance.id,
+        instance.source_id,
+        instance.destination_id,
+        instance.distance,
+    ))
+
+
+@receiver(post_delete, sender=Route)
+def unindex_deleted_route(sender, instance, **kwargs):
+    route_id = instance.id
+    transaction.on_commit(lambda: route_graph.route_deleted(route_id))
+
+
+def invalidate_cached_lists(sender, **kwargs):
+    # Bump right away so the writing request never reads its own stale
+    # pages, and again on commit so pages cached by other requests while
+    # the transaction was open are dropped as well.
+    bump_generation(sender)
+    transaction.on_commit(lambda: bump_generation(sender))
+
+
+for model in (Airport, AirplaneType, Crew, Route):
+    post_save.connect(invalidate_cached_lists, sender=model)
+    post_delete.connect(invalidate_cached_lists, sender=model)
@@ -0,0 +1,379 @@
+"""Deterministic synthetic data for profiling and benchmarks.
+
+Everything is written in bulk, orders and tickets even without model
+instances, so no model signals run. The denormalized seat counters of
+flights are filled in directly, and the caches that signals would
+invalidate are bumped at the end.
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from airport.caching import bump_generation
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.routing import route_graph
+
+SCALES = {
+    "small": {
+        "airports": 100,
+        "routes": 500,
+        "airplane_types": 10,
+        "airplanes": 50,
+        "crew": 200,
+        "flights": 2_000,
+        "users": 200,
+        "tickets": 20_000,
+    },
+    "medium": {
+        "airports": 1_000,
+        "routes": 5_000,
+        "airplane_types": 20,
+        "airplanes": 300,
+        "crew": 1_000,
+        "flights": 20_000,
+        "users": 5_000,
+        "tickets": 200_000,
+    },
+    "large": {
+        "airports": 3_000,
+        "routes": 20_000,
+        "airplane_types": 30,
+        "airplanes": 1_500,
+        "crew": 5_000,
+        "flights": 100_000,
+        "users": 50_000,
+        "tickets": 2_000_000,
+    },
+}
+
+START = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+# Every airplane departs at most once per slot, which keeps
+# (airplane, departure_time) unique.
+FLIGHT_SLOT = timedelta(hours=12)
+USER_PASSWORD = "synthetic"
+
+SYLLABLES = (
+    "ka", "lo", "mi", "ra", "ven", "dor", "sa", "tel", "bri", "no",
+    "gar", "u", "lin", "mar", "ost", "pe", "quin", "ta", "zel", "har",
+)
+FIRST_NAMES = (
+    "Olena", "Taras", "Iryna", "Andrii", "Maria", "Oleh", "Sofia",
+    "Dmytro", "Anna", "Yurii", "Kateryna", "Bohdan", "Nadia", "Petro",
+)
+LAST_NAMES = (
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko",
+    "Melnyk", "Boyko", "Marchenko", "Savchenko", "Rudenko", "Lysenko",
+)
+AIRPLANE_MODELS = (
+    "Airbus A320", "Airbus A321", "Airbus A330", "Airbus A350",
+    "Boeing 737", "Boeing 767", "Boeing 777", "Boeing 787",
+    "Embraer E190", "Bombardier CRJ900", "ATR 72", "Antonov An-158",
+)
+
+
+def email(seed, number):
+    return f"synthetic-{seed}-{number}@example.com"
+
+
+def _word(rng):
+    return "".join(
+        rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))
+    ).capitalize()
+
+
+def _spread(rng, total, capacities):
+    """Split ``total`` seats over flights without exceeding capacities."""
+    if not total:
+        return [0] * len(capacities)
+    weights = [rng.random() for _ in capacities]
+    scale = total / sum(weights)
+    sold = [
+        min(capacity, int(weight * scale))
+        for weight, capacity in zip(weights, capacities)
+    ]
+    remaining = total - sum(sold)
+    order = list(range(len(capacities)))
+    rng.shuffle(order)
+    while remaining:
+        for index in order:
+            extra = min(capacities[index] - sold[index], remaining)
+            sold[index] += extra
+            remaining -= extra
+            if not remaining:
+                break
+    return sold
+
+
+class _Generator:
+    def __init__(self, seed, batch_size, progress):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.batch_size = batch_size
+        self.progress = progress or (lambda message: None)
+        self.created = {}
+
+    def create(self, model, objects):
+        started = time.monotonic()
+        objects = model.objects.bulk_create(
+            objects, batch_size=self.batch_size
+        )
+        self.report(model, len(objects), started)
+        return objects
+
+    def report(self, model, count, started):
+        name = str(model._meta.verbose_name_plural)
+        self.created[name] = self.created.get(name, 0) + count
+        self.progress(
+            f"{name}: {count} in {time.monotonic() - started:.1f}s"
+        )
+
+    def airports(self, count):
+        cities = [_word(self.rng) for _ in range(max(count // 3, 1))]
+        return self.create(Airport, [
+            Airport(
+                name=f"{_word(self.rng)} {number} Airport",
+                closest_big_city=self.rng.choice(cities),
+            )
+            for number in range(count)
+        ])
+
+    def routes(self, count, airport_ids):
+        if count > len(airport_ids) * (len(airport_ids) - 1):
+            raise ValueError(
+                f"{len(airport_ids)} airports allow fewer than {count} routes"
+            )
+        pairs = {}
+        while len(pairs) < count:
+            source, destination = self.rng.sample(airport_ids, 2)
+            pairs.setdefault(
+                (source, destination), self.rng.randint(200, 9000)
+            )
+        return self.create(Route, [
+            Route(source_id=source, destination_id=destination, distance=km)
+            for (source, destination), km in pairs.items()
+        ])
+
+    def airplanes(self, type_count, count):
+        types = self.create(AirplaneType, [
+            AirplaneType(
+                name=AIRPLANE_MODELS[number % len(AIRPLANE_MODELS)]
+            )
+            for number in range(type_count)
+        ])
+        return self.create(Airplane, [
+            Airplane(
+                name=f"UR-{self.seed}-{number}",
+                rows=self.rng.randint(20, 60),
+                seats_in_rows=self.rng.choice((4, 6, 6, 8, 9, 10)),
+                airplane_type=self.rng.choice(types),
+            )
+            for number in range(count)
+        ])
+
+    def crew(self, count):
+        return self.create(Crew, [
+            Crew(
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+            )
+            for _ in range(count)
+        ])
+
+    def flights(self, count, routes, airplanes, tickets, start):
+        plan = [
+            (airplanes[number % len(airplanes)], self.rng.choice(routes))
+            for number in range(count)
+        ]
+        capacities = [
+            airplane.rows * airplane.seats_in_rows for airplane, _ in plan
+        ]
+        if tickets > sum(capacities):
+            raise ValueError(
+                f"{count} flights have fewer than {tickets} seats"
+            )
+        sold = _spread(self.rng, tickets, capacities)
+
+        flights = []
+        for number, ((airplane, route), seats_sold) in enumerate(
+            zip(plan, sold)
+        ):
+            departure_time = (
+                start
+                + (number // len(airplanes)) * FLIGHT_SLOT
+                + timedelta(minutes=5 * (number % len(airplanes) % 144))
+            )
+            flights.append(Flight(
+                route=route,
+                airplane=airplane,
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(
+                    minutes=30 + route.distance * 60 // 800
+                ),
+                tickets_sold=seats_sold,
+                seats_version=seats_sold,
+            ))
+        return self.create(Flight, flights)
+
+    def flight_crew(self, flights, crew_ids, per_flight):
+        per_flight = min(per_flight, len(crew_ids))
+        through = Flight.crew.through
+        self.create(through, [
+            through(flight_id=flight.id, crew_id=crew_id)
+            for flight in flights
+            for crew_id in self.rng.sample(crew_ids, per_flight)
+        ])
+
+    def users(self, count):
+        password = make_password(USER_PASSWORD)
+        User = get_user_model()
+        return self.create(User, [
+            User(email=email(self.seed, number), password=password)
+            for number in range(count)
+        ])
+
+    def orders(self, flights, user_ids, max_tickets_per_order):
+        """Sell ``tickets_sold`` random distinct seats of every flight."""
+        started = time.monotonic()
+        orders, tickets = [], []
+        order_count = ticket_count = 0
+        for flight in flights:
+            airplane = flight.airplane
+            positions = self.rng.sample(
+                range(airplane.rows * airplane.seats_in_rows),
+                flight.tickets_sold
+            )
+            version = 0
+            while positions:
+                size = self.rng.randint(1, max_tickets_per_order)
+                group, positions = positions[:size], positions[size:]
+                orders.append(self.rng.choice(user_ids))
+                for position in group:
+                    version += 1
+                    row, seat = divmod(position, airplane.seats_in_rows)
+                    tickets.append((
+                        len(orders) - 1, flight.id, row + 1, seat + 1, version
+                    ))
+            if len(tickets) >= self.batch_size * 10:
+                self._flush_orders(orders, tickets)
+                order_count += len(orders)
+                ticket_count += len(tickets)
+                orders, tickets = [], []
+        if orders:
+            self._flush_orders(orders, tickets)
+        self.report(Order, order_count + len(orders), started)
+        self.report(Ticket, ticket_count + len(tickets), started)
+
+    def _flush_orders(self, user_ids, tickets):
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        order_ids = self.insert_rows(
+            Order,
+            ("user", "created_at", "updated_at"),
+            [(user_id, now, now) for user_id in user_ids],
+            returning=True,
+        )
+        self.insert_rows(
+            Ticket,
+            ("order", "flight", "row", "seat", "version"),
+            [
+                (order_ids[order], flight_id, row, seat, version)
+                for order, flight_id, row, seat, version in tickets
+            ],
+        )
+
+    def insert_rows(self, model, field_names, rows, returning=False):
+        """Insert tuples of database values, many rows per statement.
+
+        ``bulk_create`` spends most of its time building instances and
+        preparing every value, which dominates for millions of tickets.
+        With ``returning``, the new primary keys are returned in order.
+        """
+        if not rows:
+            return []
+        fields = [model._meta.get_field(name) for name in field_names]
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ", ".join(
+            connection.ops.quote_name(field.column) for field in fields
+        )
+        returning_sql = ""
+        if returning:
+            returning_sql, _ = connection.ops.return_insert_columns(
+                [model._meta.pk]
+            )
+        size = min(
+            self.batch_size, connection.ops.bulk_batch_size(fields, rows)
+        )
+        ids = []
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), size):
+                batch = rows[start:start + size]
+                values = connection.ops.bulk_insert_sql(
+                    fields, [["%s"] * len(fields)] * len(batch)
+                )
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}) {values} "
+                    f"{returning_sql}",
+                    [value for row in batch for value in row],
+                )
+                if returning:
+                    ids.extend(row[0] for row in cursor.fetchall())
+        return ids
+
+
+@transaction.atomic
+def generate(
+    *,
+    airports,
+    routes,
+    airplane_types,
+    airplanes,
+    crew,
+    flights,
+    users,
+    tickets,
+    seed=0,
+    crew_per_flight=4,
+    max_tickets_per_order=4,
+    start=START,
+    batch_size=5000,
+    progress=None,
+):
+    """Fill every airport model; the same arguments give the same data.
+
+    Users get the emails from ``email(seed, number)`` and the password
+    ``USER_PASSWORD``. Seats are sold at random, without collisions, with
+    one to ``max_tickets_per_order`` tickets per order. Returns the number
+    of objects created per model.
+    """
+    generator = _Generator(seed, batch_size, progress)
+    airport_ids = [airport.id for airport in generator.airports(airports)]
+    route_objects = generator.routes(routes, airport_ids)
+    airplane_objects = generator.airplanes(airplane_types, airplanes)
+    crew_ids = [member.id for member in generator.crew(crew)]
+    flight_objects = generator.flights(
+        flights, route_objects, airplane_objects, tickets, start
+    )
+    generator.flight_crew(flight_objects, crew_ids, crew_per_flight)
+    user_ids = [user.id for user in generator.users(users)]
+    generator.orders(flight_objects, user_ids, max_tickets_per_order)
+
+    def invalidate():
+        for model in (Airport, AirplaneType, Crew, Route):
+            bump_generation(model)
+        route_graph.invalidate()
+
+    transaction.on_commit(invalidate)
+    return generator.created
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class QueryBudgetMixin:
+    """Assert that a GET stays within its ``settings.QUERY_BUDGETS`` entry."""
+
+    def assertWithinQueryBudget(self, view_name, args=None, data=None):
+        budget = settings.QUERY_BUDGETS[view_name]
+        url = reverse(view_name, args=args)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, data)
+
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            f"{url} ran {len(queries)} queries, budget is {budget}:\n"
+            + "\n".join(query["sql"] for query in queries.captured_queries)
+        )
+        return res
@@ -1,9 +1,18 @@
+import tempfile
+from io import BytesIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from PIL import Image
+
+from airport import images
 from airport.models import Airplane, AirplaneType
 from airport.serializers import AirplaneListSerializer
 
@@ -14,6 +23,16 @@ def detail_url(airplane_id):
     return reverse("airport:airplane-detail", args=[airplane_id])
 
 
+def image_url(airplane_id):
+    return reverse("airport:airplane-upload-image", args=[airplane_id])
+
+
+def sample_image(size=(1600, 900), image_format="PNG"):
+    buffer = BytesIO()
+    Image.new("RGB", size, "steelblue").save(buffer, image_format)
+    return buffer.getvalue()
+
+
 def sample_airplane(**params):
     airplane_type = AirplaneType.objects.create(name="Test")
     defaults = {
@@ -118,3 +137,79 @@ class AdminAirplaneApiTests(TestCase):
         res = self.client.post(AIRPLANE_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+
+class AirplaneImageUploadTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "admin", is_staff=True
+            )
+        )
+        self.airplane = sample_airplane()
+
+    def upload(self):
+        upload = SimpleUploadedFile("plane.png", sample_image())
+        return self.client.post(
+            image_url(self.airplane.id), {"image": upload}, format="multipart"
+        )
+
+    def test_upload_returns_before_resizing(self):
+        self.airplane.image_variants = {"thumbnail": {"webp": "old.webp"}}
+        self.airplane.save()
+
+        with mock.patch.object(images.executor, "submit") as submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.upload()
+
+        self.airplane.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["image_variants"], {})
+        self.assertEqual(self.airplane.image_variants, {})
+        submit.assert_called_once_with(
+            images._process_in_worker,
+            self.airplane.id,
+            self.airplane.image.name
+        )
+
+    def test_variants_listed_after_processing(self):
+        with mock.patch.object(images.executor, "submit"):
+            self.upload()
+        self.airplane.refresh_from_db()
+
+        images.process_airplane_image(
+            self.airplane.id, self.airplane.image.name
+        )
+
+        self.airplane.refresh_from_db()
+        variants = self.airplane.image_variants
+        self.assertEqual(set(variants), {"thumbnail", "medium"})
+        with default_storage.open(variants["thumbnail"]["webp"]) as file:
+            with Image.open(file) as thumbnail:
+                self.assertEqual(thumbnail.format, "WEBP")
+                self.assertEqual(thumbnail.size, (320, 180))
+        res = self.client.get(AIRPLANE_URL)
+        self.assertTrue(
+            res.data[0]["image_variants"]["medium"]["jpeg"]
+            .endswith("-medium.jpeg")
+        )
+
+    def test_stale_image_variants_discarded(self):
+        with mock.patch.object(images.executor, "submit"):
+            self.upload()
+        self.airplane.refresh_from_db()
+        first_image = self.airplane.image.name
+        with mock.patch.object(images.executor, "submit"):
+            self.upload()
+
+        images.process_airplane_image(self.airplane.id, first_image)
+
+        self.airplane.refresh_from_db()
+        self.assertEqual(self.airplane.image_variants, {})
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airport
+
+AIRPORT_URL = reverse("airport:airport-list")
+
+
+class UnauthenticatedAirportApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(AIRPORT_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class CachedAirportListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test"
+        )
+        self.client.force_authenticate(self.user)
+        Airport.objects.create(name="Boryspil", closest_big_city="Kyiv")
+
+    def test_repeated_list_served_from_cache(self):
+        first = self.client.get(AIRPORT_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(AIRPORT_URL)
+
+        self.assertTrue(all(
+            "airport_throttlecounter" in query["sql"]
+            for query in queries.captured_queries
+        ))
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(AIRPORT_URL)["ETag"]
+
+        res = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    def test_saved_airport_invalidates_cached_list(self):
+        etag = self.client.get(AIRPORT_URL)["ETag"]
+
+        Airport.objects.create(name="Zhuliany", closest_big_city="Kyiv")
+        res = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
@@ -0,0 +1,153 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+
+ASYNC_FLIGHT_URL = reverse("airport:flight-async-list")
+ASYNC_ROUTE_URL = reverse("airport:route-async-list")
+
+
+class AsyncReadEndpointTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        crew = [
+            Crew.objects.create(first_name="John", last_name=f"Doe {i}")
+            for i in range(2)
+        ]
+        airports = [
+            Airport.objects.create(
+                name=f"Airport {i}", closest_big_city=f"City {i}"
+            )
+            for i in range(4)
+        ]
+        airplane = Airplane.objects.create(
+            name="Airplane",
+            rows=10,
+            seats_in_rows=6,
+            airplane_type=AirplaneType.objects.create(name="Type"),
+        )
+        order = Order.objects.create(user=self.user)
+        self.flights = []
+        for i in range(3):
+            route = Route.objects.create(
+                source=airports[i], destination=airports[i + 1], distance=100
+            )
+            flight = Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=f"2024-02-1{3 - i}T12:00:00Z",
+                arrival_time=f"2024-02-1{3 - i}T14:00:00Z",
+            )
+            flight.crew.set(crew[:i])
+            Ticket.objects.create(
+                row=1, seat=i + 1, flight=flight, order=order
+            )
+            self.flights.append(flight)
+        self.route = route
+
+    def collect(self, url, params=None):
+        results = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            results += res.json()["results"]
+            if not res.json()["next"]:
+                return results
+            res = self.client.get(res.json()["next"])
+
+    def test_flight_list_matches_sync_endpoint(self):
+        sync = self.client.get(reverse("airport:flight-list")).json()
+
+        self.assertEqual(
+            self.collect(ASYNC_FLIGHT_URL, {"page_size": 1}),
+            sync["results"]
+        )
+
+    def test_flight_list_filters(self):
+        results = self.collect(
+            ASYNC_FLIGHT_URL, {"date_from": "2024-02-12", "page_size": 1}
+        )
+
+        self.assertEqual(
+            [flight["id"] for flight in results],
+            [self.flights[1].id, self.flights[0].id]
+        )
+
+    def test_flight_detail_matches_sync_endpoint(self):
+        flight = self.flights[2]
+
+        res = self.client.get(
+            reverse("airport:flight-async-detail", args=[flight.id])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json(),
+            self.client.get(
+                reverse("airport:flight-detail", args=[flight.id])
+            ).json()
+        )
+
+    def test_route_list_filters_by_city(self):
+        results = self.collect(ASYNC_ROUTE_URL, {"source": "city 2"})
+
+        self.assertEqual(
+            results,
+            [{
+                "id": self.route.id,
+                "source": "Airport 2",
+                "destination": "Airport 3",
+                "distance": 100,
+            }]
+        )
+
+    def test_route_detail_not_found(self):
+        res = self.client.get(
+            reverse("airport:route-async-detail", args=[self.route.id + 1])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_cursor_rejected(self):
+        res = self.client.get(ASYNC_FLIGHT_URL, {"cursor": "broken"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_impossible_date_rejected(self):
+        cursor = base64.urlsafe_b64encode(b"2024-02-30T12:00:00|1").decode()
+
+        res = self.client.get(ASYNC_FLIGHT_URL, {"cursor": cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_auth_required(self):
+        res = APIClient().get(ASYNC_FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", res["WWW-Authenticate"])
+
+    def test_writes_not_allowed(self):
+        res = self.client.post(ASYNC_ROUTE_URL, {})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -1,18 +1,50 @@
+import base64
+import datetime
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from airport.management_commands.reconcile_seat_inventory import (
+    Command as ReconcileSeatInventory
+)
 from airport.models import (
     Crew,
     Route,
     Airplane,
     Airport,
-    AirplaneType
+    AirplaneType,
+    Flight,
+    Order,
+    Ticket,
 )
+from airport.routing import find_itineraries, route_graph
+from airport.views import _past_keyset
+
+# How each database's query plan shows a seek on the departure index.
+DEPARTURE_INDEX_SEEK = {
+    "sqlite": "USING INDEX flight_departure_id_idx (departure_time",
+    "postgresql": "Index Cond: (departure_time",
+}
 
 FLIGHT_URL = reverse("airport:flight-list")
+ITINERARY_URL = reverse("airport:flight-itineraries")
+ORDER_URL = reverse("airport:order-list")
+
+
+def detail_url(flight_id):
+    return reverse("airport:flight-detail", args=[flight_id])
+
+
+def seat_map_url(flight_id):
+    return reverse("airport:flight-seat-map", args=[flight_id])
 
 
 class UnauthenticatedAirplaneApiTests(TestCase):
@@ -110,3 +142,501 @@ class AdminFlightTestCase(TestCase):
             },
         )
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_flight_creation_with_taken_departure(self):
+        payload = {
+            "crew": [self.crew.id],
+            "route": self.route.id,
+            "airplane": self.airplane.id,
+            "departure_time": "2024-02-10T12:00:00Z",
+            "arrival_time": "2024-02-10T14:00:00Z",
+        }
+        self.client.post(FLIGHT_URL, payload)
+
+        response = self.client.post(FLIGHT_URL, payload)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data)
+        self.assertEqual(Flight.objects.count(), 1)
+
+    def test_flight_update_to_taken_departure(self):
+        Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time="2024-02-10T12:00:00Z",
+            arrival_time="2024-02-10T14:00:00Z",
+        )
+        flight = Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time="2024-02-11T12:00:00Z",
+            arrival_time="2024-02-11T14:00:00Z",
+        )
+
+        response = self.client.patch(
+            detail_url(flight.id),
+            {"departure_time": "2024-02-10T12:00:00Z"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FlightSeatInventoryTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@email.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        route = Route.objects.create(
+            source=Airport.objects.create(
+                name="Source", closest_big_city="Source City"
+            ),
+            destination=Airport.objects.create(
+                name="Destination", closest_big_city="Destination City"
+            ),
+            distance=100,
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=Airplane.objects.create(
+                name="Test Airplane",
+                rows=10,
+                seats_in_rows=6,
+                airplane_type=AirplaneType.objects.create(name="Test Type"),
+            ),
+            departure_time="2024-02-10T12:00:00Z",
+            arrival_time="2024-02-10T14:00:00Z",
+        )
+
+    def test_order_updates_tickets_available(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": seat, "flight": self.flight.id}
+                for seat in (1, 2, 3)
+            ]
+        }
+
+        self.client.post(ORDER_URL, payload, format="json")
+        res = self.client.get(detail_url(self.flight.id))
+
+        self.assertEqual(res.data["tickets_available"], 57)
+
+    def test_deleted_ticket_releases_seat(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=order
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 1)
+
+        ticket.delete()
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 0)
+
+    def test_list_reads_availability_without_aggregation(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            any("GROUP BY" in query["sql"]
+                for query in queries.captured_queries)
+        )
+
+    def test_reconcile_seat_inventory(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        Flight.objects.filter(pk=self.flight.pk).update(tickets_sold=7)
+
+        call_command(ReconcileSeatInventory(), stdout=StringIO())
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 1)
+
+    def test_seat_map_packs_occupied_seats(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        Ticket.objects.create(row=2, seat=3, flight=self.flight, order=order)
+
+        res = self.client.get(seat_map_url(self.flight.id))
+
+        bitmap = base64.b64decode(res.data["occupied"])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data["full"])
+        self.assertEqual(len(bitmap), 8)
+        self.assertEqual(bitmap[0], 0b10000000)
+        self.assertEqual(bitmap[1], 0b10000000)
+
+    def test_seat_map_skips_seats_outside_smaller_airplane(self):
+        order = Order.objects.create(user=self.user)
+        for row, seat in ((1, 6), (10, 1), (2, 2)):
+            Ticket.objects.create(
+                row=row, seat=seat, flight=self.flight, order=order
+            )
+        Airplane.objects.filter(pk=self.flight.airplane_id).update(
+            rows=5, seats_in_rows=4
+        )
+
+        res = self.client.get(seat_map_url(self.flight.id))
+
+        bitmap = base64.b64decode(res.data["occupied"])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(bitmap, bytes([0b00000100, 0, 0]))
+
+    def test_seat_map_returns_seats_sold_since_version(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        version = self.client.get(
+            seat_map_url(self.flight.id)
+        ).data["version"]
+        Ticket.objects.create(row=5, seat=6, flight=self.flight, order=order)
+
+        res = self.client.get(seat_map_url(self.flight.id), {"since": version})
+
+        self.assertFalse(res.data["full"])
+        self.assertEqual(res.data["sold"], [[5, 6]])
+
+    def test_seat_map_after_release_returns_full_bitmap(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=order
+        )
+        version = self.client.get(
+            seat_map_url(self.flight.id)
+        ).data["version"]
+        ticket.delete()
+
+        res = self.client.get(seat_map_url(self.flight.id), {"since": version})
+
+        self.assertTrue(res.data["full"])
+        self.assertEqual(base64.b64decode(res.data["occupied"]), bytes(8))
+
+    def test_flight_detail_not_modified(self):
+        etag = self.client.get(detail_url(self.flight.id))["ETag"]
+
+        res = self.client.get(
+            detail_url(self.flight.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_flight_detail_modified_after_ticket_sold(self):
+        etag = self.client.get(detail_url(self.flight.id))["ETag"]
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        res = self.client.get(
+            detail_url(self.flight.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(res.data["tickets_available"], 59)
+
+    def test_flight_list_pages_by_departure_time(self):
+        for day in (13, 11, 12):
+            Flight.objects.create(
+                route=self.flight.route,
+                airplane=self.flight.airplane,
+                departure_time=f"2024-02-{day}T12:00:00Z",
+                arrival_time=f"2024-02-{day}T14:00:00Z",
+            )
+
+        first = self.client.get(FLIGHT_URL, {"page_size": 2})
+        second = self.client.get(first.data["next"])
+
+        ids = [
+            flight["id"]
+            for page in (first, second)
+            for flight in page.data["results"]
+        ]
+        self.assertEqual(
+            ids,
+            list(
+                Flight.objects
+                .order_by("departure_time", "id")
+                .values_list("id", flat=True)
+            )
+        )
+        self.assertIsNone(second.data["next"])
+
+    def test_flight_list_pages_through_same_departure_time(self):
+        for number in range(4):
+            Flight.objects.create(
+                route=self.flight.route,
+                airplane=Airplane.objects.create(
+                    name=f"Airplane {number}",
+                    rows=10,
+                    seats_in_rows=6,
+                    airplane_type=self.flight.airplane.airplane_type,
+                ),
+                departure_time=self.flight.departure_time,
+                arrival_time=self.flight.arrival_time,
+            )
+
+        pages = [self.client.get(FLIGHT_URL, {"page_size": 2})]
+        with CaptureQueriesContext(connection) as queries:
+            pages.append(self.client.get(pages[-1].data["next"]))
+        pages.append(self.client.get(pages[-1].data["next"]))
+        back = self.client.get(pages[-1].data["previous"])
+
+        ids = [
+            [flight["id"] for flight in page.data["results"]]
+            for page in pages
+        ]
+        self.assertEqual(
+            sum(ids, []),
+            list(
+                Flight.objects
+                .order_by("departure_time", "id")
+                .values_list("id", flat=True)
+            )
+        )
+        self.assertEqual(
+            [flight["id"] for flight in back.data["results"]], ids[1]
+        )
+        self.assertIsNone(pages[-1].data["next"])
+        self.assertFalse(any(
+            "OFFSET" in query["sql"] for query in queries.captured_queries
+        ))
+
+    def test_flight_list_cursor_seeks_departure_index(self):
+        if connection.vendor not in DEPARTURE_INDEX_SEEK:
+            self.skipTest("query plan format not known")
+        flights = Flight.objects.order_by("departure_time", "id")
+        position = [str(self.flight.departure_time), str(self.flight.id)]
+
+        for backwards in (False, True):
+            plan = flights.filter(_past_keyset(
+                Flight, ("departure_time", "id"), position, backwards
+            ))[:21].explain()
+
+            self.assertIn(DEPARTURE_INDEX_SEEK[connection.vendor], plan)
+
+    def test_flight_list_rejects_tampered_cursor(self):
+        cursor = base64.b64encode(b"p=2024-02-10|x").decode()
+
+        res = self.client.get(FLIGHT_URL, {"cursor": cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class FlightSearchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@email.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.kyiv = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv"
+        )
+        self.lviv = Airport.objects.create(
+            name="Danylo Halytskyi", closest_big_city="Lviv"
+        )
+        self.airplane = Airplane.objects.create(
+            name="Small",
+            rows=1,
+            seats_in_rows=2,
+            airplane_type=AirplaneType.objects.create(name="Regional"),
+        )
+        self.kyiv_lviv = self.sample_flight(
+            Route.objects.create(
+                source=self.kyiv, destination=self.lviv, distance=540
+            ),
+            "2024-02-10T09:00:00Z",
+        )
+        self.lviv_kyiv = self.sample_flight(
+            Route.objects.create(
+                source=self.lviv, destination=self.kyiv, distance=540
+            ),
+            "2024-02-10T18:00:00Z",
+        )
+        self.kyiv_lviv_later = self.sample_flight(
+            self.kyiv_lviv.route, "2024-02-12T09:00:00Z"
+        )
+
+    def sample_flight(self, route, departure_time):
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time,
+        )
+
+    def search(self, **params):
+        res = self.client.get(FLIGHT_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [flight["id"] for flight in res.data["results"]]
+
+    def test_filter_by_source_and_destination(self):
+        ids = self.search(source=self.kyiv.id, destination=self.lviv.id)
+
+        self.assertEqual(ids, [self.kyiv_lviv.id, self.kyiv_lviv_later.id])
+
+    def test_filter_by_departure_date_range(self):
+        ids = self.search(date_from="2024-02-10", date_to="2024-02-10")
+
+        self.assertEqual(ids, [self.kyiv_lviv.id, self.lviv_kyiv.id])
+
+    def test_filter_by_airplane_type(self):
+        other_type = AirplaneType.objects.create(name="Widebody")
+
+        self.assertEqual(self.search(airplane_type=other_type.id), [])
+
+    def test_filter_by_min_tickets_available(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.lviv_kyiv, order=order
+        )
+
+        ids = self.search(min_tickets_available=2)
+
+        self.assertEqual(ids, [self.kyiv_lviv.id, self.kyiv_lviv_later.id])
+
+    def test_invalid_date_rejected(self):
+        res = self.client.get(FLIGHT_URL, {"date_from": "tomorrow"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def export(self, fmt, **params):
+        res = self.client.get(
+            reverse("airport:flight-export", args=[fmt]), params
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        return b"".join(res.streaming_content).decode()
+
+    def test_export_csv(self):
+        self.kyiv_lviv.crew.add(
+            Crew.objects.create(first_name="John", last_name="Doe")
+        )
+
+        lines = self.export("csv", source=self.kyiv.id).splitlines()
+
+        self.assertEqual(
+            lines[0].split(",")[:3], ["id", "source", "destination"]
+        )
+        self.assertEqual(len(lines), 3)
+        self.assertIn("Boryspil,Danylo Halytskyi", lines[1])
+        self.assertIn("John Doe", lines[1])
+
+    def test_export_ndjson(self):
+        rows = [
+            json.loads(line)
+            for line in self.export("ndjson").splitlines()
+        ]
+
+        self.assertEqual(
+            [row["id"] for row in rows],
+            [self.kyiv_lviv.id, self.lviv_kyiv.id, self.kyiv_lviv_later.id]
+        )
+        self.assertEqual(rows[0]["tickets_available"], 2)
+        self.assertEqual(rows[0]["crew"], [])
+
+
+class ItinerarySearchTestCase(TestCase):
+    def setUp(self):
+        route_graph.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@email.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.kyiv, self.lviv, self.odesa = (
+            Airport.objects.create(name=name, closest_big_city=name)
+            for name in ("Kyiv", "Lviv", "Odesa")
+        )
+        self.airplane = Airplane.objects.create(
+            name="Small",
+            rows=1,
+            seats_in_rows=2,
+            airplane_type=AirplaneType.objects.create(name="Regional"),
+        )
+        self.kyiv_lviv = self.sample_flight(
+            self.kyiv, self.lviv, "2024-02-10T08:00:00Z", hours=1
+        )
+        self.lviv_odesa = self.sample_flight(
+            self.lviv, self.odesa, "2024-02-10T11:00:00Z", hours=2
+        )
+        self.kyiv_odesa = self.sample_flight(
+            self.kyiv, self.odesa, "2024-02-10T20:00:00Z", hours=1
+        )
+
+    def sample_flight(self, source, destination, departure_time, hours):
+        route, _ = Route.objects.get_or_create(
+            source=source, destination=destination, defaults={"distance": 500}
+        )
+        departure_time = datetime.datetime.fromisoformat(departure_time)
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + datetime.timedelta(hours=hours),
+        )
+
+    def search(self, **params):
+        defaults = {
+            "source": self.kyiv.id,
+            "destination": self.odesa.id,
+            "date": "2024-02-10",
+        }
+        defaults.update(params)
+        res = self.client.get(ITINERARY_URL, defaults)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [
+            [leg["id"] for leg in itinerary["legs"]]
+            for itinerary in res.data
+        ]
+
+    def test_connecting_and_direct_itineraries(self):
+        self.assertEqual(
+            self.search(),
+            [[self.kyiv_lviv.id, self.lviv_odesa.id], [self.kyiv_odesa.id]]
+        )
+
+    def test_max_legs_limits_connections(self):
+        self.assertEqual(self.search(max_legs=1), [[self.kyiv_odesa.id]])
+
+    def test_min_connection_time_respected(self):
+        self.assertEqual(
+            self.search(min_connection=180), [[self.kyiv_odesa.id]]
+        )
+
+    def test_full_leg_is_skipped(self):
+        order = Order.objects.create(user=self.user)
+        for seat in (1, 2):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=self.lviv_odesa, order=order
+            )
+
+        self.assertEqual(self.search(), [[self.kyiv_odesa.id]])
+
+    def test_limit_keeps_earliest_arrivals(self):
+        later = self.sample_flight(
+            self.kyiv, self.odesa, "2024-02-10T09:00:00Z", hours=5
+        )
+        day = datetime.datetime.fromisoformat("2024-02-10T00:00:00Z")
+
+        itineraries = find_itineraries(
+            self.kyiv.id,
+            self.odesa.id,
+            day,
+            day + datetime.timedelta(days=1),
+            limit=2,
+        )
+
+        self.assertEqual(
+            [[flight.id for flight in legs] for legs in itineraries],
+            [[self.kyiv_lviv.id, self.lviv_odesa.id], [later.id]]
+        )
+
+    def test_search_does_not_query_per_hop(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search(max_legs=3)
+
+        # One of them is the rate throttle's.
+        self.assertLessEqual(len(queries), 4)
@@ -0,0 +1,102 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from airport.management_commands.import_schedule import (
+    Command as ImportSchedule
+)
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+
+CSV_SCHEDULE = """\
+source,source_city,destination,destination_city,distance,airplane,\
+airplane_type,rows,seats_in_rows,departure_time,arrival_time,crew
+Boryspil,Kyiv,Lviv Airport,Lviv,540,UR-1,Regional,10,4,\
+2024-06-01T09:00:00Z,2024-06-01T10:30:00Z,John Doe; Jane Roe
+Lviv Airport,,Boryspil,,540,UR-1,,,,\
+2024-06-01T12:00:00Z,2024-06-01T13:30:00Z,Jane Roe
+"""
+
+
+class ImportScheduleTests(TestCase):
+    def import_schedule(self, content, suffix=".csv", batch_size=5000):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / f"schedule{suffix}"
+        path.write_text(content)
+        call_command(
+            ImportSchedule(),
+            str(path),
+            batch_size=batch_size,
+            stdout=StringIO()
+        )
+
+    def test_import_creates_reference_data_and_flights(self):
+        self.import_schedule(CSV_SCHEDULE, batch_size=1)
+
+        self.assertEqual(Airport.objects.count(), 2)
+        self.assertEqual(Route.objects.count(), 2)
+        self.assertEqual(AirplaneType.objects.get().name, "Regional")
+        self.assertEqual(Airplane.objects.get().rows, 10)
+        first, second = Flight.objects.order_by("departure_time")
+        self.assertEqual(first.route.source.closest_big_city, "Kyiv")
+        self.assertEqual(
+            sorted(member.full_name for member in first.crew.all()),
+            ["Jane Roe", "John Doe"]
+        )
+        self.assertEqual(
+            [member.full_name for member in second.crew.all()], ["Jane Roe"]
+        )
+
+    def test_reimport_updates_flights_in_place(self):
+        self.import_schedule(CSV_SCHEDULE)
+        changed = json.dumps({
+            "source": "Boryspil",
+            "destination": "Lviv Airport",
+            "distance": 550,
+            "airplane": "UR-1",
+            "departure_time": "2024-06-01T09:00:00Z",
+            "arrival_time": "2024-06-01T11:00:00Z",
+            "crew": ["John Doe"],
+        })
+
+        self.import_schedule(changed + "\n", suffix=".ndjson")
+
+        flight = Flight.objects.get(departure_time="2024-06-01T09:00:00Z")
+        self.assertEqual(Flight.objects.count(), 2)
+        self.assertEqual(flight.arrival_time.hour, 11)
+        self.assertEqual(flight.route.distance, 550)
+        self.assertEqual(
+            [member.full_name for member in flight.crew.all()], ["John Doe"]
+        )
+
+    def test_changed_airplane_touches_its_flights(self):
+        self.import_schedule(CSV_SCHEDULE)
+        later = Flight.objects.get(departure_time="2024-06-01T12:00:00Z")
+        changed = json.dumps({
+            "source": "Boryspil",
+            "destination": "Lviv Airport",
+            "airplane": "UR-1",
+            "rows": 12,
+            "departure_time": "2024-06-01T09:00:00Z",
+            "arrival_time": "2024-06-01T10:30:00Z",
+        })
+
+        self.import_schedule(changed + "\n", suffix=".ndjson")
+
+        self.assertEqual(Airplane.objects.get().rows, 12)
+        self.assertGreater(
+            Flight.objects.get(pk=later.pk).updated_at, later.updated_at
+        )
+
+    def test_new_airport_needs_city(self):
+        schedule = CSV_SCHEDULE.replace("Boryspil,Kyiv", "Boryspil,")
+
+        with self.assertRaisesMessage(CommandError, "Line 2: source_city"):
+            self.import_schedule(schedule)
+
+        self.assertFalse(Flight.objects.exists())
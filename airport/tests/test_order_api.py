@@ -0,0 +1,298 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.holds import SeatConflict
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.serializers import OrderSerializer
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def sample_flight(**params):
+    source = Airport.objects.create(
+        name="Lviv Airport", closest_big_city="Lviv"
+    )
+    destination = Airport.objects.create(
+        name="Kyiv Airport", closest_big_city="Kyiv"
+    )
+    route = Route.objects.create(
+        source=source, destination=destination, distance=400
+    )
+    airplane = Airplane.objects.create(
+        name="Test Airplane",
+        rows=10,
+        seats_in_rows=6,
+        airplane_type=AirplaneType.objects.create(name="Test Type"),
+    )
+    defaults = {
+        "route": route,
+        "airplane": airplane,
+        "departure_time": "2024-02-10T12:00:00Z",
+        "arrival_time": "2024-02-10T14:00:00Z",
+    }
+    defaults.update(params)
+
+    return Flight.objects.create(**defaults)
+
+
+class UnauthenticatedOrderApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class OrderCreateTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test", is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_create_order_inserts_tickets_in_one_statement(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": seat, "flight": self.flight.id}
+                for seat in range(1, 6)
+            ]
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(ORDER_URL, payload, format="json")
+
+        ticket_inserts = [
+            query for query in queries.captured_queries
+            if query["sql"].startswith('INSERT INTO "airport_ticket"')
+        ]
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(ticket_inserts), 1)
+        self.assertEqual(Ticket.objects.count(), 5)
+
+    def test_duplicate_seats_in_payload_reported_per_seat(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+            ]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data["tickets"]["non_field_errors"]), 1)
+        self.assertFalse(Order.objects.exists())
+
+    def test_taken_seat_conflicts_during_validation(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn("already taken", res.data["tickets"][0])
+
+    def test_validation_queries_do_not_depend_on_ticket_count(self):
+        other_flight = sample_flight()
+
+        def count_queries(seats):
+            payload = {
+                "tickets": [
+                    {"row": 3, "seat": seat, "flight": flight.id}
+                    for seat in seats
+                    for flight in (self.flight, other_flight)
+                ]
+            }
+            serializer = OrderSerializer(data=payload)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+            return len(queries)
+
+        self.assertEqual(count_queries([1]), count_queries(range(1, 7)))
+
+    def test_seat_out_of_airplane_range_rejected(self):
+        payload = {
+            "tickets": [{"row": 11, "seat": 1, "flight": self.flight.id}]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("row", res.data["tickets"][0])
+
+    def test_taken_seat_on_insert_reported_per_seat(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=2, seat=3, flight=self.flight, order=order)
+        serializer = OrderSerializer()
+
+        with self.assertRaises(SeatConflict) as context:
+            serializer.create({
+                "user": self.user,
+                "tickets": [
+                    {"row": 2, "seat": 3, "flight": self.flight},
+                    {"row": 2, "seat": 4, "flight": self.flight},
+                ],
+            })
+
+        errors = context.exception.detail["tickets"]
+        self.assertEqual(len(errors), 1)
+        self.assertIn("seat 3 in row 2", errors[0])
+
+
+class OrderListTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_orders_shares_flights_between_tickets(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        for seat in (1, 2, 3):
+            Ticket.objects.create(row=1, seat=seat, flight=flight, order=order)
+
+        res = self.client.get(ORDER_URL)
+
+        result = res.data["results"][0]
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [ticket["flight"] for ticket in result["tickets"]],
+            [flight.id] * 3
+        )
+        self.assertEqual(len(result["flights"]), 1)
+        self.assertEqual(result["flights"][0]["id"], flight.id)
+        self.assertEqual(result["flights"][0]["tickets_available"], 57)
+
+    def test_list_orders_lists_crew_by_id(self):
+        flight = sample_flight()
+        flight.crew.add(
+            Crew.objects.create(first_name="Bob", last_name="Doe"),
+            Crew.objects.create(first_name="Ann", last_name="Doe"),
+        )
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(ORDER_URL)
+
+        crew_query = next(
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith('SELECT ("airport_flight_crew"')
+        )
+        self.assertIn('ORDER BY "airport_crew"."id"', crew_query)
+        self.assertEqual(
+            res.data["results"][0]["flights"][0]["crew"],
+            ["Bob Doe", "Ann Doe"]
+        )
+
+    def test_list_orders_query_count_is_constant(self):
+        for _ in range(4):
+            flight = sample_flight()
+            order = Order.objects.create(user=self.user)
+            Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(ORDER_URL, {"page_size": 1})
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(ORDER_URL, {"page_size": 4})
+
+        self.assertEqual(len(few), len(many))
+
+    def test_list_orders_not_modified(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, flight=sample_flight(), order=order
+        )
+        etag = self.client.get(ORDER_URL)["ETag"]
+
+        res = self.client.get(ORDER_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_orders_modified_after_ticket_added(self):
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        etag = self.client.get(ORDER_URL)["ETag"]
+        Ticket.objects.create(row=1, seat=2, flight=flight, order=order)
+
+        res = self.client.get(ORDER_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"][0]["tickets"]), 2)
+
+    def test_list_orders_without_tickets(self):
+        Order.objects.create(user=self.user)
+
+        res = self.client.get(ORDER_URL)
+        not_modified = self.client.get(
+            ORDER_URL, HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["tickets"], [])
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test"
+        )
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        for seat in (1, 2):
+            Ticket.objects.create(row=3, seat=seat, flight=flight, order=order)
+
+    def test_export_requires_admin(self):
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(reverse("airport:order-export", args=["csv"]))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_streams_tickets(self):
+        admin = get_user_model().objects.create_user(
+            "admin@test.com", "admin", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+
+        res = self.client.get(
+            reverse("airport:order-export", args=["ndjson"])
+        )
+
+        rows = [
+            json.loads(line)
+            for line in b"".join(res.streaming_content).splitlines()
+        ]
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertEqual([row["seat"] for row in rows], [1, 2])
+        self.assertEqual(rows[0]["user"], "test@test.com")
+        self.assertEqual(rows[0]["source"], "Lviv Airport")
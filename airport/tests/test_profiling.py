@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.tests.test_order_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+PROFILING_URL = reverse("airport:profiling")
+PROFILED_MIDDLEWARE = [
+    "airport.middleware.ProfilingMiddleware", *settings.MIDDLEWARE
+]
+
+
+@override_settings(MIDDLEWARE=PROFILED_MIDDLEWARE, PROFILING_SAMPLE_RATE=1)
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "admin", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        sample_flight()
+
+    def test_sampled_request_has_server_timing(self):
+        res = self.client.get(FLIGHT_URL)
+
+        timing = res["Server-Timing"]
+        for metric in ("db;dur=", "serializer;dur=", "total;dur="):
+            self.assertIn(metric, timing)
+        self.assertRegex(timing, r'queries;desc="\d+"')
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_unsampled_request_not_profiled(self):
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertNotIn("Server-Timing", res)
+        self.assertEqual(self.client.get(PROFILING_URL).data["views"], [])
+
+    def test_histograms_per_view_and_action(self):
+        self.client.get(FLIGHT_URL)
+        self.client.get(FLIGHT_URL)
+
+        views = {
+            entry["view"]: entry
+            for entry in self.client.get(PROFILING_URL).data["views"]
+        }
+        flights = views["FlightViewSet.list"]
+        self.assertEqual(flights["requests"], 2)
+        self.assertEqual(
+            sum(bucket["count"] for bucket in flights["queries"]["buckets"]),
+            2
+        )
+        self.assertGreater(flights["queries"]["mean"], 0)
+        self.assertGreater(flights["response_bytes"]["sum"], 0)
+
+    def test_reset_histograms(self):
+        self.client.get(FLIGHT_URL)
+
+        res = self.client.delete(PROFILING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        views = [
+            entry["view"]
+            for entry in self.client.get(PROFILING_URL).data["views"]
+        ]
+        # The reset request itself is recorded after the reset.
+        self.assertEqual(views, ["ProfilingView.delete"])
+
+    def test_histograms_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "test")
+        )
+
+        res = self.client.get(PROFILING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
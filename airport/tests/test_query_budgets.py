@@ -0,0 +1,129 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, modify_settings, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.middleware import QueryBudgetExceeded
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.tests.query_budget import QueryBudgetMixin
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """List and detail endpoints run a fixed number of queries."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        crew = [
+            Crew.objects.create(first_name="John", last_name=f"Doe {i}")
+            for i in range(3)
+        ]
+        airports = [
+            Airport.objects.create(name=f"Airport {i}", closest_big_city="X")
+            for i in range(4)
+        ]
+        for i in range(3):
+            airplane = Airplane.objects.create(
+                name=f"Airplane {i}",
+                rows=10,
+                seats_in_rows=6,
+                airplane_type=AirplaneType.objects.create(name=f"Type {i}"),
+            )
+            route = Route.objects.create(
+                source=airports[i], destination=airports[i + 1], distance=100
+            )
+            flight = Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=f"2024-02-1{i}T12:00:00Z",
+                arrival_time=f"2024-02-1{i}T14:00:00Z",
+            )
+            flight.crew.set(crew)
+            order = Order.objects.create(user=self.user)
+            for seat in (1, 2):
+                Ticket.objects.create(
+                    row=1, seat=seat, flight=flight, order=order
+                )
+        self.airport = airports[0]
+        self.airplane = airplane
+        self.route = route
+        self.flight = flight
+        self.order = order
+        self.crew = crew[0]
+
+    def assertWithinQueryBudget(self, view_name, args=None, data=None):
+        res = super().assertWithinQueryBudget(view_name, args, data)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def test_airport_endpoints(self):
+        self.assertWithinQueryBudget("airport:airport-list")
+        self.assertWithinQueryBudget(
+            "airport:airport-detail", args=[self.airport.id]
+        )
+
+    def test_airplane_type_endpoints(self):
+        self.assertWithinQueryBudget("airport:airplanetype-list")
+        self.assertWithinQueryBudget(
+            "airport:airplanetype-detail",
+            args=[self.airplane.airplane_type_id]
+        )
+
+    def test_crew_endpoints(self):
+        self.assertWithinQueryBudget("airport:crew-list")
+        self.assertWithinQueryBudget(
+            "airport:crew-detail", args=[self.crew.id]
+        )
+
+    def test_route_endpoints(self):
+        self.assertWithinQueryBudget("airport:route-list")
+        self.assertWithinQueryBudget(
+            "airport:route-list", data={"source": "Airport"}
+        )
+        self.assertWithinQueryBudget(
+            "airport:route-detail", args=[self.route.id]
+        )
+
+    def test_airplane_endpoints(self):
+        self.assertWithinQueryBudget("airport:airplane-list")
+        self.assertWithinQueryBudget(
+            "airport:airplane-detail", args=[self.airplane.id]
+        )
+
+    def test_flight_endpoints(self):
+        self.assertWithinQueryBudget("airport:flight-list")
+        self.assertWithinQueryBudget(
+            "airport:flight-detail", args=[self.flight.id]
+        )
+
+    def test_order_endpoints(self):
+        self.assertWithinQueryBudget("airport:order-list")
+        self.assertWithinQueryBudget(
+            "airport:order-detail", args=[self.order.id]
+        )
+
+    @modify_settings(MIDDLEWARE={
+        "prepend": "airport.middleware.QueryBudgetMiddleware"
+    })
+    @override_settings(
+        QUERY_BUDGETS={"airport:route-list": 1}, QUERY_BUDGET_RAISE=True
+    )
+    def test_middleware_raises_when_budget_exceeded(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse("airport:route-list"))
@@ -1,10 +1,22 @@
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from airport.management_commands.shortest_distances import (
+    Command as ShortestDistances
+)
 from airport.models import Route, Airport
+from airport import routing
+from airport.routing import ROUTE_GRAPH_VERSION_KEY, route_graph
 from airport.serializers import RouteListSerializer, RouteDetailSerializer
 
 
@@ -13,6 +25,7 @@ def detail_url(route_id):
 
 
 ROUTE_URL = reverse("airport:route-list")
+SHORTEST_DISTANCE_URL = reverse("airport:route-shortest-distance")
 
 
 def sample_route(**params):
@@ -64,7 +77,7 @@ class AuthenticatedRouteApiTests(TestCase):
         serializer = RouteListSerializer(airplanes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_filter_routes_by_source(self):
         route1 = sample_route()
@@ -79,8 +92,8 @@ class AuthenticatedRouteApiTests(TestCase):
         serializer1 = RouteListSerializer(route1)
         serializer2 = RouteListSerializer(route2)
 
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer1.data, res.data)
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer1.data, res.data["results"])
 
     def test_filter_routes_by_destination(self):
         route1 = sample_route()
@@ -95,8 +108,8 @@ class AuthenticatedRouteApiTests(TestCase):
         serializer1 = RouteListSerializer(route1)
         serializer2 = RouteListSerializer(route2)
 
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer1.data, res.data)
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer1.data, res.data["results"])
 
     def test_route_creation_forbidden(self):
         source = Airport.objects.create(
@@ -126,6 +139,40 @@ class AuthenticatedRouteApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_filter_routes_by_city(self):
+        route1 = sample_route()
+        route2 = sample_route(
+            destination=Airport.objects.create(
+                name="Danylo Halytskyi", closest_big_city="Lviv"
+            )
+        )
+
+        res = self.client.get(ROUTE_URL, {"destination": "lviv"})
+
+        serializer1 = RouteListSerializer(route1)
+        serializer2 = RouteListSerializer(route2)
+
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer1.data, res.data["results"])
+
+    def test_filter_routes_by_source_and_destination(self):
+        route1 = sample_route()
+        route2 = sample_route(
+            destination=Airport.objects.create(
+                name="Dolyna", closest_big_city="Dolyna"
+            )
+        )
+
+        res = self.client.get(
+            ROUTE_URL, {"source": "lviv", "destination": "kyiv"}
+        )
+
+        serializer1 = RouteListSerializer(route1)
+        serializer2 = RouteListSerializer(route2)
+
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
+
 
 class AdminRouteApiTests(TestCase):
     def setUp(self):
@@ -151,3 +198,96 @@ class AdminRouteApiTests(TestCase):
             }
         )
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class ShortestDistanceTests(TestCase):
+    def setUp(self):
+        route_graph.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test"
+        )
+        self.client.force_authenticate(self.user)
+        self.kyiv, self.lviv, self.odesa = (
+            Airport.objects.create(name=name, closest_big_city=name)
+            for name in ("Kyiv", "Lviv", "Odesa")
+        )
+        Route.objects.create(
+            source=self.kyiv, destination=self.lviv, distance=100
+        )
+        Route.objects.create(
+            source=self.lviv, destination=self.odesa, distance=100
+        )
+        self.direct = Route.objects.create(
+            source=self.kyiv, destination=self.odesa, distance=300
+        )
+
+    def shortest(self, source, destination):
+        return self.client.get(
+            SHORTEST_DISTANCE_URL,
+            {"source": source.id, "destination": destination.id}
+        )
+
+    def test_shortest_distance_through_connection(self):
+        res = self.shortest(self.kyiv, self.odesa)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["distance"], 200)
+        self.assertEqual(
+            res.data["airports"], [self.kyiv.id, self.lviv.id, self.odesa.id]
+        )
+
+    def test_unreachable_airport(self):
+        res = self.shortest(self.odesa, self.kyiv)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_repeated_lookup_uses_cache(self):
+        route_graph.shortest_path(self.kyiv.id, self.odesa.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            route_graph.shortest_path(self.kyiv.id, self.odesa.id)
+
+        self.assertEqual(len(queries), 0)
+
+    def test_route_change_invalidates_cache(self):
+        self.assertEqual(self.shortest(self.kyiv, self.odesa).data["distance"],
+                         200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.direct.distance = 150
+            self.direct.save()
+
+        self.assertEqual(self.shortest(self.kyiv, self.odesa).data["distance"],
+                         150)
+
+    def test_command_prints_all_pairs(self):
+        out = StringIO()
+
+        call_command(ShortestDistances(), stdout=out)
+
+        self.assertIn(f"{self.kyiv.id},{self.odesa.id},200", out.getvalue())
+
+    def test_change_elsewhere_reloads_graph(self):
+        self.assertEqual(self.shortest(self.kyiv, self.odesa).data["distance"],
+                         200)
+        # Another process shortens the direct route and counts its change;
+        # then this process saves an unrelated route.
+        Route.objects.filter(pk=self.direct.pk).update(distance=150)
+        cache.incr(ROUTE_GRAPH_VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            Route.objects.create(
+                source=self.odesa, destination=self.lviv, distance=100
+            )
+
+        self.assertEqual(self.shortest(self.kyiv, self.odesa).data["distance"],
+                         150)
+
+    def test_shortest_distances_kept_for_recent_sources(self):
+        with mock.patch.object(routing, "SHORTEST_DISTANCES_CACHED", 2):
+            for airport in (self.kyiv, self.lviv, self.odesa):
+                route_graph.shortest_distances(airport.id)
+
+            self.assertEqual(
+                list(route_graph._shortest), [self.lviv.id, self.odesa.id]
+            )
@@ -0,0 +1,157 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.management_commands.purge_seat_holds import (
+    Command as PurgeSeatHolds
+)
+from airport.models import Order, SeatHold, Ticket
+from airport.tests.test_order_api import ORDER_URL, sample_flight
+
+
+def hold_url(flight_id):
+    return reverse("airport:flight-hold", args=[flight_id])
+
+
+class SeatHoldTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test", is_staff=True
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@test.com", "other", is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def hold(self, *seats, user=None):
+        self.client.force_authenticate(user or self.user)
+        return self.client.post(
+            hold_url(self.flight.id),
+            {"seats": [{"row": row, "seat": seat} for row, seat in seats]},
+            format="json"
+        )
+
+    def order(self, *seats, user=None):
+        self.client.force_authenticate(user or self.user)
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                    for row, seat in seats
+                ]
+            },
+            format="json"
+        )
+
+    def test_hold_seats(self):
+        res = self.hold((1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["seats"]), 2)
+        self.assertEqual(
+            set(SeatHold.objects.values_list("user", "row", "seat")),
+            {(self.user.id, 1, 1), (self.user.id, 1, 2)}
+        )
+
+    def test_seat_held_by_someone_else_conflicts(self):
+        self.hold((1, 1))
+
+        res = self.hold((1, 2), (1, 1), user=self.other)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn("held by another customer", res.data["seats"][0])
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    def test_sold_seat_cannot_be_held(self):
+        order = Order.objects.create(user=self.other)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        res = self.hold((1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn("already taken", res.data["seats"][0])
+
+    def test_lost_race_names_requested_seats(self):
+        # The competing hold was released again before it could be named.
+        with mock.patch.object(
+            SeatHold.objects, "bulk_create", side_effect=IntegrityError
+        ):
+            res = self.hold((1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(len(res.data["seats"]), 2)
+        self.assertIn("being booked", res.data["seats"][0])
+
+    def test_expired_hold_can_be_taken_over(self):
+        self.hold((1, 1))
+        SeatHold.objects.update(expires_at=timezone.now())
+
+        res = self.hold((1, 1), user=self.other)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.other)
+
+    def test_order_converts_own_holds_into_tickets(self):
+        self.hold((1, 1), (1, 2))
+
+        res = self.order((1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_order_for_seat_held_by_someone_else_conflicts(self):
+        self.hold((1, 1))
+
+        res = self.order((1, 1), user=self.other)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Order.objects.exists())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 0)
+
+    def test_release_holds(self):
+        self.hold((1, 1))
+
+        res = self.client.delete(hold_url(self.flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_hold_outside_airplane_rejected(self):
+        res = self.hold((11, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purge_deletes_only_expired_holds(self):
+        now = timezone.now()
+        for seat, expires_at in (
+            (1, now - timedelta(seconds=1)),
+            (2, now + timedelta(minutes=5)),
+            (3, now - timedelta(minutes=5)),
+        ):
+            SeatHold.objects.create(
+                flight=self.flight,
+                row=1,
+                seat=seat,
+                user=self.user,
+                expires_at=expires_at,
+            )
+
+        call_command(PurgeSeatHolds(), batch_size=1, stdout=StringIO())
+
+        self.assertEqual(
+            list(SeatHold.objects.values_list("seat", flat=True)), [2]
+        )
@@ -0,0 +1,123 @@
+from collections import Counter
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F
+from django.test import TestCase
+
+from airport.management_commands.generate_synthetic_data import (
+    Command as GenerateSyntheticData
+)
+from airport.models import Airport, Flight, Order, Route, Ticket
+
+SCALE = {
+    "airports": "12",
+    "routes": "30",
+    "airplanes": "4",
+    "crew": "10",
+    "flights": "40",
+    "users": "5",
+    "tickets": "1500",
+}
+
+
+def generate(*args):
+    options = [f"--{name}={value}" for name, value in SCALE.items()]
+    call_command(
+        GenerateSyntheticData(), *options, *args, stdout=StringIO()
+    )
+
+
+def snapshot():
+    """Generated data without the database ids."""
+    return {
+        "airports": list(
+            Airport.objects.order_by("id")
+            .values_list("name", "closest_big_city")
+        ),
+        "flights": list(
+            Flight.objects.order_by("id").values_list(
+                "route__source__name",
+                "airplane__name",
+                "departure_time",
+                "tickets_sold",
+            )
+        ),
+        "tickets": list(
+            Ticket.objects.order_by("id")
+            .values_list("flight__departure_time", "row", "seat", "version")
+        ),
+    }
+
+
+class GenerateSyntheticDataTests(TestCase):
+    def test_generates_requested_volume(self):
+        generate()
+
+        self.assertEqual(Airport.objects.count(), 12)
+        self.assertEqual(Route.objects.count(), 30)
+        self.assertEqual(Flight.objects.count(), 40)
+        self.assertEqual(Ticket.objects.count(), 1500)
+        self.assertTrue(Order.objects.exists())
+        self.assertEqual(
+            Flight.crew.through.objects.count(), 40 * 4
+        )
+
+    def test_seats_are_valid_and_counted(self):
+        generate()
+
+        self.assertFalse(
+            Ticket.objects.filter(
+                row__gt=F("flight__airplane__rows")
+            ).exists()
+            or Ticket.objects.filter(
+                seat__gt=F("flight__airplane__seats_in_rows")
+            ).exists()
+        )
+        sold = Counter(
+            dict(
+                Ticket.objects.values_list("flight")
+                .annotate(count=Count("id"))
+                .values_list("flight", "count")
+            )
+        )
+        for flight in Flight.objects.all():
+            self.assertEqual(flight.tickets_sold, sold[flight.id])
+            self.assertEqual(flight.seats_version, sold[flight.id])
+
+    def test_same_seed_generates_same_data(self):
+        generate("--seed=7")
+        first = snapshot()
+        for model in (Ticket, Order, Flight, Route, Airport):
+            model.objects.all().delete()
+        get_user_model().objects.all().delete()
+
+        generate("--seed=7")
+
+        self.assertEqual(snapshot(), first)
+
+    def test_seed_cannot_be_generated_twice(self):
+        generate()
+
+        with self.assertRaisesMessage(CommandError, "pick another --seed"):
+            generate()
+
+    def test_too_many_tickets_rejected(self):
+        with self.assertRaisesMessage(CommandError, "fewer than"):
+            generate("--tickets=1000000")
+
+    def test_generates_without_tickets(self):
+        generate("--tickets=0")
+
+        self.assertEqual(Flight.objects.count(), 40)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_last_batch_flushed_before_the_end(self):
+        # Every flight fills a batch of ten tickets, so nothing is left
+        # to write after the last one.
+        generate("--batch-size=1")
+
+        self.assertEqual(Ticket.objects.count(), 1500)
@@ -0,0 +1,83 @@
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport.management_commands.purge_throttle_counters import (
+    Command as PurgeThrottleCounters
+)
+from airport.models import ThrottleCounter
+from airport.throttling import SharedUserRateThrottle
+
+WINDOW = 1_800_000_000
+
+
+class ThreePerMinuteThrottle(SharedUserRateThrottle):
+    rate = "3/min"
+
+
+class SharedThrottleTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "test"
+        )
+        self.request = APIRequestFactory().get("/")
+        force_authenticate(self.request, self.user)
+        self.request.user = self.user
+
+    def allow(self, now):
+        throttle = ThreePerMinuteThrottle()
+        throttle.timer = lambda: now
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_limit_is_shared_between_workers(self):
+        for second in range(3):
+            cache.clear()
+            self.assertTrue(self.allow(WINDOW + second)[0])
+
+        cache.clear()
+        allowed, throttle = self.allow(WINDOW + 10)
+
+        self.assertFalse(allowed)
+        self.assertEqual(throttle.wait(), 50)
+        self.assertEqual(ThrottleCounter.objects.get().count, 3)
+
+    def test_allowed_request_costs_one_query(self):
+        self.allow(WINDOW)
+
+        with CaptureQueriesContext(connection) as queries:
+            allowed = self.allow(WINDOW + 1)[0]
+
+        self.assertTrue(allowed)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(ThrottleCounter.objects.get().count, 2)
+
+    def test_previous_window_is_weighted(self):
+        ThrottleCounter.objects.create(
+            key=f"throttle_user_{self.user.pk}",
+            window_start=WINDOW - 60,
+            count=6,
+        )
+
+        allowed, throttle = self.allow(WINDOW + 15)
+        self.assertFalse(allowed)
+        self.assertEqual(throttle.wait(), 15)
+        self.assertTrue(self.allow(WINDOW + 31)[0])
+
+    def test_purge_keeps_counters_still_in_use(self):
+        now = int(time.time())
+        ThrottleCounter.objects.create(key="old", window_start=0, count=1)
+        ThrottleCounter.objects.create(key="new", window_start=now, count=1)
+
+        call_command(PurgeThrottleCounters(), stdout=StringIO())
+
+        self.assertEqual(
+            list(ThrottleCounter.objects.values_list("key", flat=True)),
+            ["new"]
+        )
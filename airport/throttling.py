@@ -0,0 +1,98 @@
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.db.models import F
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+from airport.models import ThrottleCounter
+
+
+def _count_sql():
+    table = connection.ops.quote_name(ThrottleCounter._meta.db_table)
+    return (
+        f"INSERT INTO {table} (key, window_start, count) VALUES (%s, %s, 1) "
+        "ON CONFLICT (key, window_start) "
+        f"DO UPDATE SET count = {table}.count + 1 "
+        f"RETURNING {table}.count, ("
+        f"SELECT previous.count FROM {table} AS previous "
+        "WHERE previous.key = %s AND previous.window_start = %s)"
+    )
+
+
+class SharedRateThrottleMixin:
+    """Keep throttle counters in the database instead of the local cache.
+
+    Every worker increments the same ``ThrottleCounter`` rows, so limits
+    hold across processes and restarts. Requests are counted per fixed
+    window and the limit is checked against a sliding estimate: the
+    current window plus the previous one weighted by how much of it still
+    overlaps the last ``duration`` seconds. An allowed request costs one
+    upsert that returns both counts; a refused one also takes its count
+    back. ``aallow_request`` runs the same queries in a worker thread.
+    """
+
+    def _count(self, request, view):
+        """Count the request and return False if it is over the limit."""
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        self.window = int(self.now // self.duration) * self.duration
+        with connection.cursor() as cursor:
+            cursor.execute(_count_sql(), [
+                self.key,
+                self.window,
+                self.key,
+                self.window - self.duration,
+            ])
+            count, previous = cursor.fetchone()
+
+        self.elapsed = self.now - self.window
+        self.previous = previous or 0
+        self.current = count - 1
+        estimate = (
+            self.previous * (1 - self.elapsed / self.duration)
+            + self.current
+        )
+        if estimate < self.num_requests:
+            return True
+
+        # Refused requests do not count against the limit.
+        ThrottleCounter.objects.filter(
+            key=self.key, window_start=self.window
+        ).update(count=F("count") - 1)
+        return False
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        if not self._count(request, view):
+            return self.throttle_failure()
+        return True
+
+    async def aallow_request(self, request, view):
+        if self.rate is None:
+            return True
+        if not await sync_to_async(self._count)(request, view):
+            return self.throttle_failure()
+        return True
+
+    def wait(self):
+        remaining = self.duration - self.elapsed
+        if self.current >= self.num_requests or not self.previous:
+            return remaining
+
+        # The previous window's weight has to drop far enough to leave
+        # room for one more request.
+        allowed_at = self.duration * (
+            1 - (self.num_requests - self.current) / self.previous
+        )
+        return max(allowed_at - self.elapsed, 0)
+
+
+class SharedAnonRateThrottle(SharedRateThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class SharedUserRateThrottle(SharedRateThrottleMixin, UserRateThrottle):
+    pass
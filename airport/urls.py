@@ -1,6 +1,12 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from airport.async_views import (
+    AsyncFlightDetailView,
+    AsyncFlightListView,
+    AsyncRouteDetailView,
+    AsyncRouteListView,
+)
 from airport.views import (
     AirportViewSet,
     OrderViewSet,
@@ -9,6 +15,7 @@ from airport.views import (
     RouteViewSet,
     FlightViewSet,
     AirplaneViewSet,
+    ProfilingView,
 )
 
 router = routers.DefaultRouter()
@@ -20,6 +27,29 @@ router.register("routes", RouteViewSet)
 router.register("airplanes", AirplaneViewSet)
 router.register("flights", FlightViewSet)
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("", include(router.urls)),
+    path(
+        "async/flights/",
+        AsyncFlightListView.as_view(),
+        name="flight-async-list"
+    ),
+    path(
+        "async/flights/<int:pk>/",
+        AsyncFlightDetailView.as_view(),
+        name="flight-async-detail"
+    ),
+    path(
+        "async/routes/",
+        AsyncRouteListView.as_view(),
+        name="route-async-list"
+    ),
+    path(
+        "async/routes/<int:pk>/",
+        AsyncRouteDetailView.as_view(),
+        name="route-async-detail"
+    ),
+    path("profiling/", ProfilingView.as_view(), name="profiling"),
+]
 
 app_name = "airport"
@@ -1,11 +1,30 @@
-from django.db.models import F, Count
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max, Prefetch, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-
+from rest_framework.views import APIView
+
+from airport import profiling
+from airport.caching import CachedListMixin, conditional_response
+from airport.exports import (
+    FLIGHT_FIELDS,
+    TICKET_FIELDS,
+    flight_rows,
+    streaming_export,
+    ticket_rows,
+)
+from airport.images import schedule_image_processing
 from airport.models import (
     Airport,
     Order,
@@ -14,8 +33,11 @@ from airport.models import (
     Route,
     Airplane,
     Flight,
+    SeatHold,
+    Ticket,
 )
 from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+from airport.routing import find_itineraries, route_graph
 from airport.serializers import (
     AirportSerializer,
     OrderSerializer,
@@ -31,12 +53,207 @@ from airport.serializers import (
     OrderListSerializer,
     AirplaneImageSerializer,
     AirplaneListSerializer,
+    ItinerarySerializer,
+    SeatHoldSerializer,
 )
+from airport.seat_map import pack_occupied_seats
+
+
+def _params_to_int(qs, name):
+    try:
+        return [int(str_id) for str_id in qs.split(",")]
+    except ValueError:
+        raise ValidationError({name: "must be a comma separated id list"})
+
+
+def _param_to_int(qs, name, default=None, minimum=None, maximum=None):
+    if qs is None:
+        if default is None:
+            raise ValidationError({name: "this parameter is required"})
+        return default
+    try:
+        value = int(qs)
+    except ValueError:
+        raise ValidationError({name: "must be an integer"})
+    if minimum is not None and value < minimum:
+        raise ValidationError({name: f"must be at least {minimum}"})
+    if maximum is not None and value > maximum:
+        raise ValidationError({name: f"must be at most {maximum}"})
+    return value
+
+
+def _param_to_datetime(qs, name, days=0):
+    """Start of the given day, shifted by ``days``, in the current tz."""
+    try:
+        date = datetime.date.fromisoformat(qs)
+    except ValueError:
+        raise ValidationError({name: "must be a date in YYYY-MM-DD format"})
+    return timezone.make_aware(
+        datetime.datetime.combine(date, datetime.time.min)
+        + datetime.timedelta(days=days)
+    )
+
+
+def _filter_flights(queryset, params):
+    """Apply the flight search query parameters to ``queryset``."""
+    source = params.get("source")
+    destination = params.get("destination")
+    date_from = params.get("date_from")
+    date_to = params.get("date_to")
+    airplane_type = params.get("airplane_type")
+    min_tickets_available = params.get("min_tickets_available")
+
+    if source or destination:
+        routes = Route.objects.all()
+        if source:
+            routes = routes.filter(
+                source_id__in=_params_to_int(source, "source")
+            )
+        if destination:
+            routes = routes.filter(
+                destination_id__in=_params_to_int(
+                    destination, "destination"
+                )
+            )
+        queryset = queryset.filter(route__in=routes.values("id"))
+    if date_from:
+        queryset = queryset.filter(
+            departure_time__gte=_param_to_datetime(date_from, "date_from")
+        )
+    if date_to:
+        queryset = queryset.filter(
+            departure_time__lt=_param_to_datetime(
+                date_to, "date_to", days=1
+            )
+        )
+    if airplane_type:
+        queryset = queryset.filter(
+            airplane__airplane_type_id__in=_params_to_int(
+                airplane_type, "airplane_type"
+            )
+        )
+    if min_tickets_available:
+        try:
+            min_tickets_available = int(min_tickets_available)
+        except ValueError:
+            raise ValidationError(
+                {"min_tickets_available": "must be an integer"}
+            )
+        queryset = queryset.filter(
+            tickets_available__gte=min_tickets_available
+        )
+
+    return queryset
+
+
+def _airports_named(name):
+    """Ids of airports whose name or closest big city contains ``name``."""
+    return (
+        Airport.objects
+        .filter(Q(name__icontains=name) | Q(closest_big_city__icontains=name))
+        .values_list("id", flat=True)
+    )
+
+
+def _past_keyset(model, ordering, values, reverse=False):
+    """Rows after ``values`` in ``ordering``, or before them if reversed.
+
+    ``values`` are the cursor's strings for each ascending ordering field.
+    Besides the row comparison, the condition bounds the first field on
+    its own: databases cannot seek an index with the OR of the comparison
+    alone and would filter every row before the cursor.
+    """
+    fields = [model._meta.get_field(name) for name in ordering]
+    if len(values) != len(fields):
+        raise NotFound("Invalid cursor")
+    try:
+        values = [
+            field.to_python(value) for field, value in zip(fields, values)
+        ]
+    except DjangoValidationError:
+        raise NotFound("Invalid cursor")
+
+    lookup, bound = ("lt", "lte") if reverse else ("gt", "gte")
+    condition = Q()
+    for index, name in enumerate(ordering):
+        ties = dict(zip(ordering[:index], values[:index]))
+        condition |= Q(**ties, **{f"{name}__{lookup}": values[index]})
+    return Q(**{f"{ordering[0]}__{bound}": values[0]}) & condition
+
+
+class IdCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "id"
+
+
+class FlightPagination(IdCursorPagination):
+    """Keyset pages over ``(departure_time, id)``.
+
+    DRF's cursor only holds the first ordering field and skips ties with
+    an offset, which scans every flight departing at the same time. Here
+    the cursor holds both fields, like the one of ``AsyncFlightListView``,
+    so each page starts with an index seek and never needs an offset.
+    """
+
+    ordering = ("departure_time", "id")
 
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
 
-class AirportViewSet(viewsets.ModelViewSet):
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor and self.cursor.position
+
+        if reverse:
+            queryset = queryset.order_by(
+                *[f"-{field}" for field in self.ordering]
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(_past_keyset(
+                queryset.model, self.ordering, position.split("|"), reverse
+            ))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > self.page_size:
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = following_position is not None
+            self.next_position = position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = position is not None
+            self.next_position = following_position
+            self.previous_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _get_position_from_instance(self, instance, ordering):
+        return "|".join(str(getattr(instance, name)) for name in ordering)
+
+
+class AirportViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
+    pagination_class = IdCursorPagination
+    cache_models = (Airport,)
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
@@ -53,20 +270,29 @@ class OrderViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_queryset(self):
-        queryset = self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(user_id=self.request.user.id)
 
-        if self.action in ("list", "retrieve"):
-            queryset = (
-                queryset
-                .prefetch_related(
-                    "tickets",
+        if self.action == "list":
+            queryset = queryset.prefetch_related(
+                Prefetch(
                     "tickets__flight",
-                    "tickets__order",
-                    "tickets__flight__airplane",
+                    queryset=(
+                        Flight.objects
+                        .select_related(
+                            "airplane__airplane_type",
+                            "route__source",
+                            "route__destination"
+                        )
+                        .with_tickets_available()
+                    )
+                ),
+                Prefetch(
                     "tickets__flight__crew",
-                    "tickets__flight__route__source",
-                )
+                    queryset=Crew.objects.order_by("id")
+                ),
             )
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related("tickets")
 
         return queryset
 
@@ -76,27 +302,72 @@ class OrderViewSet(viewsets.ModelViewSet):
 
         return OrderSerializer
 
+    def list(self, request, *args, **kwargs):
+        state = (
+            Order.objects
+            .filter(user_id=request.user.id)
+            .aggregate(
+                orders=Count("id", distinct=True),
+                orders_updated_at=Max("updated_at"),
+                # Orders without tickets have no flights.
+                flights_updated_at=Coalesce(
+                    Max("tickets__flight__updated_at"), Max("updated_at")
+                ),
+            )
+        )
+        if state["orders_updated_at"] is None:
+            return super().list(request, *args, **kwargs)
+
+        return conditional_response(
+            request,
+            f"{state['orders']}:{state['orders_updated_at'].isoformat()}:"
+            f"{state['flights_updated_at'].isoformat()}",
+            max(state["orders_updated_at"], state["flights_updated_at"]),
+            lambda: super(OrderViewSet, self).list(request, *args, **kwargs)
+        )
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path=r"export/(?P<fmt>csv|ndjson)",
+        permission_classes=(IsAdminUser,)
+    )
+    def export(self, request, fmt):
+        """All tickets of all orders, one per line, streamed."""
+        return streaming_export(
+            fmt, "tickets", TICKET_FIELDS, ticket_rows(Ticket.objects.all())
+        )
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
+    cache_models = (AirplaneType,)
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
+    pagination_class = IdCursorPagination
+    cache_models = (Crew,)
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Route.objects.all()
     serializer_class = RouteSerializer
+    pagination_class = IdCursorPagination
+    cache_models = (Route, Airport)
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    @staticmethod
+    def _airport_ids(name):
+        return list(_airports_named(name))
+
     def get_queryset(self):
         queryset = self.queryset
         source = self.request.query_params.get("source")
@@ -104,20 +375,15 @@ class RouteViewSet(viewsets.ModelViewSet):
 
         if source:
             queryset = queryset.filter(
-                source__name__icontains=source
+                source_id__in=self._airport_ids(source)
             )
         if destination:
             queryset = queryset.filter(
-                destination__name__icontains=destination
-            )
-        if source and destination:
-            queryset = queryset.filter(
-                source__name__icontains=source,
-                destination__name__icontains=destination
+                destination_id__in=self._airport_ids(destination)
             )
 
         if self.action in ("list", "retrieve"):
-            queryset.select_related("source", "destination")
+            queryset = queryset.select_related("source", "destination")
 
         return queryset
 
@@ -133,39 +399,71 @@ class RouteViewSet(viewsets.ModelViewSet):
             OpenApiParameter(
                 "source",
                 type={"type": "list", "items": {"type": "string"}},
-                description="Fiter by source name"
+                description="Fiter by source airport name or city"
             ),
             OpenApiParameter(
                 "destination",
                 type={"type": "list", "items": {"type": "string"}},
-                description="Fiter by destination name"
+                description="Fiter by destination airport name or city"
             ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "source",
+                type=int,
+                required=True,
+                description="Source airport id"
+            ),
+            OpenApiParameter(
+                "destination",
+                type=int,
+                required=True,
+                description="Destination airport id"
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="shortest-distance")
+    def shortest_distance(self, request):
+        """Shortest route distance between two airports and its stops."""
+        source = _param_to_int(request.query_params.get("source"), "source")
+        destination = _param_to_int(
+            request.query_params.get("destination"), "destination"
+        )
+
+        shortest = route_graph.shortest_path(source, destination)
+        if shortest is None:
+            raise NotFound("No route connects these airports.")
+
+        distance, airports = shortest
+        return Response({
+            "source": source,
+            "destination": destination,
+            "distance": distance,
+            "airports": airports,
+        })
+
 
 class AirplaneViewSet(viewsets.ModelViewSet):
     queryset = Airplane.objects.all()
     serializer_class = AirplaneSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
-    @staticmethod
-    def _params_to_int(qs):
-        return [int(str_id) for str_id in qs.split(",")]
-
     def get_queryset(self):
         queryset = self.queryset
         airplane_type = self.request.query_params.get("airplane_type")
         if airplane_type:
-            airplane_type_ids = self._params_to_int(airplane_type)
+            airplane_type_ids = _params_to_int(airplane_type, "airplane_type")
             queryset = queryset.filter(
                 airplane_type__id__in=airplane_type_ids
             )
 
         if self.action in ("list", "retrieve"):
-            queryset.prefetch_related("airplane_type__name")
+            queryset = queryset.select_related("airplane_type")
 
         return queryset
 
@@ -183,8 +481,11 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(airplane, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # Variants of the previous image no longer apply; new ones are
+            # rendered in the background and appear once they are ready.
+            airplane = serializer.save(image_variants={})
+            schedule_image_processing(airplane)
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(
@@ -203,6 +504,7 @@ class AirplaneViewSet(viewsets.ModelViewSet):
 class FlightViewSet(viewsets.ModelViewSet):
     queryset = Flight.objects.all()
     serializer_class = FlightSerializer
+    pagination_class = FlightPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_queryset(self):
@@ -215,12 +517,15 @@ class FlightViewSet(viewsets.ModelViewSet):
                     "route__source",
                     "route__destination"
                 )
-                .prefetch_related("crew")
-                .annotate(tickets_available=F(
-                    "airplane__rows") * F(
-                    "airplane__seats_in_rows") - Count(
-                    "tickets"))
+                .prefetch_related(
+                    Prefetch("crew", queryset=Crew.objects.order_by("id"))
+                )
+                .with_tickets_available()
             )
+        if self.action == "list":
+            queryset = _filter_flights(queryset, self.request.query_params)
+        if self.action in ("seat_map", "hold"):
+            queryset = queryset.select_related("airplane")
 
         return queryset
 
@@ -229,4 +534,257 @@ class FlightViewSet(viewsets.ModelViewSet):
             return FlightListSerializer
         if self.action == "retrieve":
             return FlightDetailSerializer
+        if self.action == "hold":
+            return SeatHoldSerializer
         return FlightSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            updated_at = (
+                Flight.objects
+                .filter(pk=kwargs["pk"])
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+        except (TypeError, ValueError):
+            updated_at = None
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        return conditional_response(
+            request,
+            updated_at.isoformat(),
+            updated_at,
+            lambda: super(FlightViewSet, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "source",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by source airport id`s"
+            ),
+            OpenApiParameter(
+                "destination",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by destination airport id`s"
+            ),
+            OpenApiParameter(
+                "date_from",
+                type=datetime.date,
+                description="Departure on or after this date (YYYY-MM-DD)"
+            ),
+            OpenApiParameter(
+                "date_to",
+                type=datetime.date,
+                description="Departure on or before this date (YYYY-MM-DD)"
+            ),
+            OpenApiParameter(
+                "airplane_type",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by airplane type id`s"
+            ),
+            OpenApiParameter(
+                "min_tickets_available",
+                type=int,
+                description="Only flights with at least this many free seats"
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "source",
+                type=int,
+                required=True,
+                description="Source airport id"
+            ),
+            OpenApiParameter(
+                "destination",
+                type=int,
+                required=True,
+                description="Destination airport id"
+            ),
+            OpenApiParameter(
+                "date",
+                type=datetime.date,
+                required=True,
+                description="Departure date of the first leg (YYYY-MM-DD)"
+            ),
+            OpenApiParameter(
+                "max_legs",
+                type=int,
+                description="Maximum number of flights, 1 to 3 (default 2)"
+            ),
+            OpenApiParameter(
+                "min_connection",
+                type=int,
+                description="Minimum connection time in minutes (default 60)"
+            ),
+            OpenApiParameter(
+                "max_connection",
+                type=int,
+                description="Maximum connection time in minutes "
+                            "(default 1440)"
+            ),
+            OpenApiParameter(
+                "seats",
+                type=int,
+                description="Seats needed on every leg (default 1)"
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False)
+    def itineraries(self, request):
+        """Connecting journeys between two airports on a given date."""
+        params = request.query_params
+        date = params.get("date")
+        if not date:
+            raise ValidationError({"date": "this parameter is required"})
+        min_connection = _param_to_int(
+            params.get("min_connection"), "min_connection", 60, minimum=0
+        )
+        max_connection = _param_to_int(
+            params.get("max_connection"), "max_connection", 1440,
+            minimum=min_connection
+        )
+
+        itineraries = find_itineraries(
+            _param_to_int(params.get("source"), "source"),
+            _param_to_int(params.get("destination"), "destination"),
+            _param_to_datetime(date, "date"),
+            _param_to_datetime(date, "date", days=1),
+            max_legs=_param_to_int(
+                params.get("max_legs"), "max_legs", 2, minimum=1, maximum=3
+            ),
+            min_connection=datetime.timedelta(minutes=min_connection),
+            max_connection=datetime.timedelta(minutes=max_connection),
+            seats=_param_to_int(params.get("seats"), "seats", 1, minimum=1),
+        )
+
+        serializer = ItinerarySerializer(
+            [
+                {
+                    "departure_time": legs[0].departure_time,
+                    "arrival_time": legs[-1].arrival_time,
+                    "distance": sum(flight.route.distance for flight in legs),
+                    "legs": legs,
+                }
+                for legs in itineraries
+            ],
+            many=True
+        )
+        return Response(serializer.data)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path=r"export/(?P<fmt>csv|ndjson)"
+    )
+    def export(self, request, fmt):
+        """The schedule, streamed; takes the filters of the flight list."""
+        flights = _filter_flights(
+            Flight.objects.with_tickets_available(), request.query_params
+        )
+        return streaming_export(
+            fmt, "flights", FLIGHT_FIELDS, flight_rows(flights)
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "since",
+                type=int,
+                description="Return only seats sold after this version"
+            )
+        ]
+    )
+    @action(methods=["GET"], detail=True, url_path="seat-map")
+    def seat_map(self, request, pk=None):
+        """Seat occupancy as a bitmap, or the seats sold since a version.
+
+        A delta is only possible when no seat was released after ``since``;
+        otherwise the full bitmap is returned and ``full`` is true.
+        """
+        flight = self.get_object()
+        since = request.query_params.get("since")
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                raise ValidationError({"since": "must be an integer"})
+
+        data = {
+            "flight": flight.id,
+            "rows": flight.airplane.rows,
+            "seats_in_rows": flight.airplane.seats_in_rows,
+            "version": flight.seats_version,
+        }
+        tickets = Ticket.objects.filter(flight=flight).order_by()
+
+        if (
+            since is not None
+            and flight.seats_released_version <= since <= flight.seats_version
+        ):
+            data["full"] = False
+            data["since"] = since
+            data["sold"] = [
+                list(seat) for seat in
+                tickets.filter(version__gt=since).values_list("row", "seat")
+            ]
+            return Response(data)
+
+        data["full"] = True
+        data["occupied"] = pack_occupied_seats(
+            tickets.values_list("row", "seat"),
+            flight.airplane.rows,
+            flight.airplane.seats_in_rows,
+        )
+        return Response(data)
+
+    @action(methods=["POST", "DELETE"], detail=True)
+    def hold(self, request, pk=None):
+        """Hold seats for ``SEAT_HOLD_TTL`` seconds until they are ordered.
+
+        Seats sold or held by someone else are answered with 409. DELETE
+        releases every seat the user holds on the flight.
+        """
+        flight = self.get_object()
+        if request.method == "DELETE":
+            SeatHold.objects.filter(
+                flight=flight, user_id=request.user.id
+            ).delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.context["flight"] = flight
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user_id=request.user.id)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ProfilingView(APIView):
+    """Histograms of the requests sampled by ``ProfilingMiddleware``.
+
+    Views are listed with the most total time first. DELETE clears them.
+    """
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response({
+            "sample_rate": settings.PROFILING_SAMPLE_RATE,
+            "views": profiling.histograms(),
+        })
+
+    @extend_schema(responses={204: None})
+    def delete(self, request):
+        profiling.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,71 @@
+"""PostgreSQL backend that borrows connections from a per-process pool.
+
+Django 4.2 has no connection pool of its own, and persistent connections
+(``CONN_MAX_AGE``) do not suit ASGI, where every request runs in its own
+thread. With this backend Django still "opens" and "closes" a connection
+per request, but the psycopg2 connection is taken from and handed back to
+a ``ThreadedConnectionPool`` instead of being set up and torn down.
+
+Pool sizes come from the ``POOL`` entry of the database settings::
+
+    "POOL": {"MIN_SIZE": 2, "MAX_SIZE": 20}
+"""
+import threading
+
+import psycopg2
+from django.db.backends.postgresql import base
+from psycopg2.pool import ThreadedConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PooledDatabase:
+    """Stand-in for the psycopg2 module whose ``connect`` uses the pool."""
+
+    def __init__(self, wrapper):
+        self.wrapper = wrapper
+
+    def __getattr__(self, name):
+        return getattr(psycopg2, name)
+
+    def connect(self, **conn_params):
+        pool = self.wrapper.get_pool(conn_params)
+        connection = pool.getconn()
+        if self.wrapper.settings_dict["CONN_HEALTH_CHECKS"]:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                # Without autocommit the ping opens a transaction, and
+                # Django cannot switch autocommit on inside one.
+                connection.rollback()
+            except psycopg2.Error:
+                pool.putconn(connection, close=True)
+                connection = pool.getconn()
+        return connection
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.Database = PooledDatabase(self)
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            if self.alias not in _pools:
+                sizes = self.settings_dict.get("POOL", {})
+                _pools[self.alias] = ThreadedConnectionPool(
+                    sizes.get("MIN_SIZE", 1),
+                    sizes.get("MAX_SIZE", 10),
+                    **conn_params
+                )
+            return _pools[self.alias]
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # putconn() rolls back an unfinished transaction and drops
+                # connections that are already broken.
+                _pools[self.alias].putconn(
+                    self.connection, close=bool(self.connection.closed)
+                )
@@ -24,9 +24,11 @@ SECRET_KEY = os.environ["SECRET_KEY"]
 
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get("DEBUG") == "1"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = os.environ.get(
+    "ALLOWED_HOSTS", "localhost,127.0.0.1"
+).split(",")
 
 INTERNAL_IPS = [
     "127.0.0.1",
@@ -41,7 +43,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "debug_toolbar",
+    "django.contrib.postgres",
     "rest_framework",
     "drf_spectacular",
     "airport",
@@ -50,7 +52,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -59,6 +61,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# The toolbar instruments every request, so it only runs in development.
+if DEBUG:
+    INSTALLED_APPS.insert(
+        INSTALLED_APPS.index("rest_framework"), "debug_toolbar"
+    )
+    MIDDLEWARE.insert(1, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "app.urls"
 
 TEMPLATES = [
@@ -83,16 +92,56 @@ WSGI_APPLICATION = "app.wsgi.application"
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
 
+# CONN_MAX_AGE keeps a connection open per worker thread for that many
+# seconds (0 closes it after every request), CONN_HEALTH_CHECKS pings reused
+# connections before handing them out. DB_POOL=1 switches to a per-process
+# connection pool instead, meant for ASGI; connections then go back to the
+# pool after every request.
+
+DB_POOL = os.environ.get("DB_POOL") == "1"
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        "ENGINE": (
+            "app.postgresql_pool"
+            if DB_POOL
+            else "django.db.backends.postgresql_psycopg2"
+        ),
         "HOST": os.environ.get("POSTGRES_HOST"),
         "NAME": os.environ["POSTGRES_NAME"],
         "USER": os.environ["POSTGRES_USER"],
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
+        "CONN_MAX_AGE": (
+            0 if DB_POOL else int(os.environ.get("CONN_MAX_AGE", 60))
+        ),
+        "CONN_HEALTH_CHECKS": os.environ.get("CONN_HEALTH_CHECKS", "1") == "1",
+        "POOL": {
+            "MIN_SIZE": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "MAX_SIZE": int(os.environ.get("DB_POOL_MAX_SIZE", 20)),
+        },
+    }
+}
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Local memory by default; set CACHE_BACKEND to e.g.
+# django.core.cache.backends.filebased.FileBasedCache (CACHE_LOCATION is a
+# directory) or django.core.cache.backends.redis.RedisCache (CACHE_LOCATION
+# is a redis:// URL, requires the redis package) to share it between
+# processes.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
     }
 }
 
+# Seconds a rendered list response of reference data stays cached.
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 3600))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -126,10 +175,25 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = "static/"
+# Filled by collectstatic when the image is built and served by WhiteNoise,
+# so the admin and API docs work without a reverse proxy.
+STATIC_ROOT = BASE_DIR / "staticfiles"
 
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
 
+# Let Django serve uploaded media outside of DEBUG, e.g. when no reverse
+# proxy sits in front of the application server.
+SERVE_MEDIA = os.environ.get("SERVE_MEDIA", "1" if DEBUG else "0") == "1"
+
+# Resized copies of uploaded airplane images, as name -> longest side in px.
+# They are generated by a per-process thread pool after the upload commits.
+AIRPLANE_IMAGE_VARIANTS = {
+    "thumbnail": 320,
+    "medium": 1024,
+}
+IMAGE_PROCESSING_WORKERS = int(os.environ.get("IMAGE_PROCESSING_WORKERS", 2))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -140,12 +204,15 @@ AUTH_USER_MODEL = "user.User"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "airport.throttling.SharedAnonRateThrottle",
+        "airport.throttling.SharedUserRateThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "1000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": os.environ.get("THROTTLE_ANON_RATE", "100/day"),
+        "user": os.environ.get("THROTTLE_USER_RATE", "1000/day"),
+    },
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
     ),
 }
 
@@ -162,8 +229,50 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Seconds a seat stays held for a customer before others may take it.
+SEAT_HOLD_TTL = int(os.environ.get("SEAT_HOLD_TTL", 600))
+
+# Maximum number of SQL queries per request, keyed by URL name. Checked by
+# airport.tests.query_budget in the test suite and, when
+# QUERY_BUDGET_MIDDLEWARE is set, by airport.middleware.QueryBudgetMiddleware
+# at runtime. Budgets include the single upsert of the shared rate throttle;
+# the stateless JWT authentication does not load the user.
+QUERY_BUDGETS = {
+    "airport:airport-list": 2,
+    "airport:airport-detail": 2,
+    "airport:airplanetype-list": 2,
+    "airport:airplanetype-detail": 2,
+    "airport:crew-list": 2,
+    "airport:crew-detail": 2,
+    "airport:route-list": 3,
+    "airport:route-detail": 2,
+    "airport:airplane-list": 2,
+    "airport:airplane-detail": 2,
+    "airport:flight-list": 3,
+    "airport:flight-detail": 5,
+    "airport:order-list": 7,
+    "airport:order-detail": 3,
+}
+QUERY_BUDGET_RAISE = os.environ.get("QUERY_BUDGET_RAISE") == "1"
+
+if os.environ.get("QUERY_BUDGET_MIDDLEWARE") == "1":
+    MIDDLEWARE.insert(0, "airport.middleware.QueryBudgetMiddleware")
+
+# Fraction of requests profiled by airport.middleware.ProfilingMiddleware,
+# e.g. 0.01; with 0 the middleware is left out.
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+if PROFILING_SAMPLE_RATE > 0:
+    MIDDLEWARE.insert(0, "airport.middleware.ProfilingMiddleware")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=3),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.serializers.ClaimsTokenObtainPairSerializer"
+    ),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "user.serializers.ClaimsTokenRefreshSerializer"
+    ),
+    "TOKEN_USER_CLASS": "user.authentication.ClaimsTokenUser",
 }
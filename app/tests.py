@@ -0,0 +1,122 @@
+from unittest import mock, skipUnless
+
+import psycopg2
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from app.postgresql_pool import base
+
+
+class FakeConnection:
+    """Mimics how psycopg2 refuses autocommit changes in a transaction."""
+
+    def __init__(self):
+        self._autocommit = False
+        self.in_transaction = False
+        self.closed = 0
+
+    @property
+    def autocommit(self):
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        if self.in_transaction:
+            raise psycopg2.ProgrammingError(
+                "set_session cannot be used inside a transaction"
+            )
+        self._autocommit = value
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.in_transaction = False
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, sql):
+        if not self.connection.autocommit:
+            self.connection.in_transaction = True
+
+
+class FakePool:
+    def __init__(self):
+        self.connections = []
+
+    def getconn(self):
+        if not self.connections:
+            self.connections.append(FakeConnection())
+        return self.connections.pop()
+
+    def putconn(self, connection, close=False):
+        connection.rollback()
+        if not close:
+            self.connections.append(connection)
+
+
+class FakeWrapper:
+    def __init__(self, health_checks):
+        self.settings_dict = {"CONN_HEALTH_CHECKS": health_checks}
+        self.pool = FakePool()
+
+    def get_pool(self, conn_params):
+        return self.pool
+
+
+class PooledDatabaseTests(SimpleTestCase):
+    def checkout(self, wrapper):
+        pooled = base.PooledDatabase(wrapper).connect()
+        # Django switches autocommit on right after connecting.
+        pooled.autocommit = True
+        return pooled
+
+    def test_first_checkout_with_health_checks(self):
+        wrapper = FakeWrapper(health_checks=True)
+
+        pooled = self.checkout(wrapper)
+
+        self.assertTrue(pooled.autocommit)
+        self.assertFalse(pooled.in_transaction)
+
+    def test_checkout_after_return_with_health_checks(self):
+        wrapper = FakeWrapper(health_checks=True)
+        wrapper.pool.putconn(self.checkout(wrapper))
+
+        self.assertTrue(self.checkout(wrapper).autocommit)
+
+    def test_checkout_without_health_checks(self):
+        self.assertTrue(
+            self.checkout(FakeWrapper(health_checks=False)).autocommit
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "needs PostgreSQL")
+class PooledPostgresTests(TestCase):
+    def test_pooled_connections_are_usable(self):
+        settings_dict = {
+            **connection.settings_dict,
+            "CONN_HEALTH_CHECKS": True,
+            "POOL": {"MIN_SIZE": 1, "MAX_SIZE": 2},
+        }
+        # The alias must exist for the signal handlers of contrib.postgres.
+        with mock.patch.dict(base._pools, clear=True):
+            pooled = base.DatabaseWrapper(settings_dict)
+            try:
+                for _ in range(3):
+                    with pooled.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                        self.assertEqual(cursor.fetchone(), (1,))
+                    self.assertTrue(pooled.get_autocommit())
+                    pooled.close()
+            finally:
+                base._pools[pooled.alias].closeall()
@@ -0,0 +1,116 @@
+"""Measure requests per second of one endpoint of a running server.
+
+Runs ``--concurrency`` clients that each keep one HTTP connection open and
+send GET requests for ``--duration`` seconds, then prints throughput and
+latency percentiles. Only the standard library is used, so it runs from
+any checkout::
+
+    python -m benchmarks.http_load --email admin@example.com \\
+        --password secret --url http://localhost:8000/api/airport/flights/
+
+Compare settings by restarting the server between runs, e.g. with
+``CONN_MAX_AGE=0`` and then ``CONN_MAX_AGE=60``.
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+
+def obtain_token(url, email, password):
+    parts = urlsplit(urljoin(url, "/api/user/token/"))
+    connection = http.client.HTTPConnection(parts.netloc)
+    connection.request(
+        "POST",
+        parts.path,
+        json.dumps({"email": email, "password": password}),
+        {"Content-Type": "application/json"},
+    )
+    response = connection.getresponse()
+    body = json.loads(response.read())
+    if response.status != 200:
+        raise SystemExit(f"Could not obtain a token: {body}")
+    return body["access"]
+
+
+def run_client(url, headers, deadline, latencies, errors):
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    connection = http.client.HTTPConnection(parts.netloc)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors.append(1)
+            connection.close()
+            connection = http.client.HTTPConnection(parts.netloc)
+            continue
+        if response.status != 200:
+            errors.append(response.status)
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url", default="http://localhost:8000/api/airport/flights/"
+    )
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30)
+    args = parser.parse_args()
+
+    headers = {
+        "Authorization": (
+            f"Bearer {obtain_token(args.url, args.email, args.password)}"
+        ),
+        "Accept": "application/json",
+    }
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + args.duration
+    clients = [
+        threading.Thread(
+            target=run_client,
+            args=(args.url, headers, deadline, latencies, errors),
+        )
+        for _ in range(args.concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+
+    if not latencies:
+        raise SystemExit(f"No successful requests, {len(errors)} errors")
+    latencies.sort()
+    print(json.dumps({
+        "url": args.url,
+        "concurrency": args.concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_second": round(len(latencies) / args.duration, 1),
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 2),
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
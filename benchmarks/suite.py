@@ -0,0 +1,322 @@
+"""Benchmark the booking and search hot paths and write a JSON report.
+
+Creates a test database (kept between runs with ``--keepdb``), fills it
+with ``airport.synthetic`` at the chosen ``--scale`` (again whenever the
+kept data has another scale or seed) and sends every scenario
+``--requests`` times through the Django test client, with a JWT like a
+real client. Latency percentiles and SQL query counts per scenario
+are written to ``--output``; pass the report of an earlier commit as
+``--baseline`` to print the differences::
+
+    python -m benchmarks.suite --scale medium --keepdb --output after.json \\
+        --baseline before.json
+
+Requests are served in process, so the numbers leave out the network and
+the application server and show the cost of the code and the database.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+# The benchmark user must not run into the rate limits.
+os.environ.setdefault("THROTTLE_ANON_RATE", "1000000/min")
+os.environ.setdefault("THROTTLE_USER_RATE", "1000000/min")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+)
+from django.urls import reverse  # noqa: E402
+
+from airport.models import (  # noqa: E402
+    Airport,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.synthetic import SCALES, email, generate  # noqa: E402
+from benchmarks.http_load import percentile  # noqa: E402
+from user.serializers import ClaimsTokenObtainPairSerializer  # noqa: E402
+
+SCENARIOS = (
+    "flight-list",
+    "flight-search",
+    "flight-detail",
+    "route-search",
+    "order-list",
+    "order-create",
+)
+
+
+class Scenarios:
+    """Build the requests of each scenario from ids sampled up front."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.flight_ids = list(
+            Flight.objects.order_by("?").values_list("id", flat=True)[:5000]
+        )
+        self.route_pairs = list(
+            Route.objects.order_by("?")
+            .values_list("source_id", "destination_id")[:5000]
+        )
+        self.cities = list(
+            Airport.objects.order_by()
+            .values_list("closest_big_city", flat=True)
+            .distinct()[:5000]
+        )
+        self.first_departure = (
+            Flight.objects.order_by("departure_time")
+            .values_list("departure_time", flat=True)
+            .first()
+        )
+
+    def flight_list(self):
+        return "get", reverse("airport:flight-list"), None, 200
+
+    def flight_search(self):
+        source, destination = self.rng.choice(self.route_pairs)
+        date_from = self.first_departure + timedelta(
+            days=self.rng.randint(0, 30)
+        )
+        return "get", reverse("airport:flight-list"), {
+            "source": source,
+            "destination": destination,
+            "date_from": date_from.date().isoformat(),
+        }, 200
+
+    def flight_detail(self):
+        path = reverse(
+            "airport:flight-detail", args=[self.rng.choice(self.flight_ids)]
+        )
+        return "get", path, None, 200
+
+    def route_search(self):
+        return "get", reverse("airport:route-list"), {
+            "source": self.rng.choice(self.cities),
+            "destination": self.rng.choice(self.cities),
+        }, 200
+
+    def order_list(self):
+        return "get", reverse("airport:order-list"), None, 200
+
+    def order_create(self):
+        # Pick free seats before the clock starts.
+        flight = Flight.objects.select_related("airplane").get(
+            pk=self.rng.choice(self.flight_ids)
+        )
+        taken = set(
+            Ticket.objects.filter(flight=flight).values_list("row", "seat")
+        )
+        free = [
+            (row, seat)
+            for row in range(1, flight.airplane.rows + 1)
+            for seat in range(1, flight.airplane.seats_in_rows + 1)
+            if (row, seat) not in taken
+        ]
+        seats = self.rng.sample(free, min(len(free), self.rng.randint(1, 4)))
+        return "post", reverse("airport:order-list"), {
+            "tickets": [
+                {"flight": flight.id, "row": row, "seat": seat}
+                for row, seat in seats
+            ]
+        }, 201
+
+
+def summarize(latencies, queries, errors):
+    latencies = sorted(seconds * 1000 for seconds in latencies)
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p90": round(percentile(latencies, 0.90), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "max": round(latencies[-1], 3),
+        },
+        "queries": {
+            "mean": round(statistics.fmean(queries), 2),
+            "max": max(queries),
+        },
+    }
+
+
+def run_scenario(client, build, requests, warmup):
+    latencies, queries, errors = [], [], 0
+    for number in range(warmup + requests):
+        method, path, data, expected = build()
+        send = getattr(client, method)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            if method == "post":
+                response = send(path, data, content_type="application/json")
+            else:
+                response = send(path, data)
+            elapsed = time.perf_counter() - started
+        if number < warmup:
+            continue
+        if response.status_code != expected:
+            errors += 1
+            continue
+        latencies.append(elapsed)
+        queries.append(len(captured))
+    return summarize(latencies, queries, errors)
+
+
+def benchmark_user():
+    """A user with orders, made staff so that it may also place them."""
+    user = (
+        get_user_model().objects
+        .filter(pk=Order.objects.values("user_id")[:1])
+        .first()
+    )
+    user.is_staff = True
+    user.save(update_fields=["is_staff"])
+    return user
+
+
+def is_loaded(scale, seed):
+    """Whether the database holds the data of ``scale`` and ``seed``.
+
+    Only models the scenarios never write to are counted, since order
+    create adds orders and tickets on every run.
+    """
+    preset = SCALES[scale]
+    return (
+        Airport.objects.count() == preset["airports"]
+        and Route.objects.count() == preset["routes"]
+        and Flight.objects.count() == preset["flights"]
+        and get_user_model().objects.filter(email=email(seed, 0)).exists()
+    )
+
+
+def dataset():
+    return {
+        str(model._meta.verbose_name_plural): model.objects.count()
+        for model in (Airport, Route, Flight, Order, Ticket)
+    }
+
+
+def commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    """Print how every scenario changed since ``baseline``."""
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or "latency_ms" not in before or (
+            "latency_ms" not in result
+        ):
+            continue
+        old, new = before["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        change = (new - old) / old * 100 if old else 0
+        print(
+            f"{name:15} p95 {old:9.2f} -> {new:9.2f} ms ({change:+6.1f}%)  "
+            f"queries {before['queries']['max']} -> "
+            f"{result['queries']['max']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--keepdb", action="store_true")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_config = setup_databases(
+        verbosity=1, interactive=False, keepdb=args.keepdb
+    )
+    try:
+        if not is_loaded(args.scale, args.seed):
+            if Flight.objects.exists():
+                print(
+                    f"Replacing the kept data with scale {args.scale}",
+                    file=sys.stderr,
+                )
+                call_command("flush", interactive=False, verbosity=0)
+            generate(
+                seed=args.seed,
+                progress=lambda message: print(message, file=sys.stderr),
+                **SCALES[args.scale],
+            )
+
+        rng = random.Random(args.seed)
+        user = benchmark_user()
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        client = Client(
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+            HTTP_ACCEPT="application/json",
+        )
+        scenarios = Scenarios(rng)
+
+        report = {
+            "commit": commit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "scale": args.scale,
+            "seed": args.seed,
+            "dataset": dataset(),
+            "scenarios": {},
+        }
+        for name in args.scenario or SCENARIOS:
+            print(f"Running {name}", file=sys.stderr)
+            report["scenarios"][name] = run_scenario(
+                client,
+                getattr(scenarios, name.replace("-", "_")),
+                args.requests,
+                args.warmup,
+            )
+    finally:
+        teardown_databases(old_config, verbosity=1, keepdb=args.keepdb)
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(json.dumps(report["scenarios"], indent=2))
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(report, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import (
+    JWTStatelessUserAuthentication
+)
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+
+def _revocation_key(user_id):
+    return f"user:tokens-revoked:{user_id}"
+
+
+def add_user_claims(token, user):
+    """Copy what permission checks need from ``user`` into ``token``."""
+    token["is_staff"] = user.is_staff
+    token["is_active"] = user.is_active
+    token["claims_iat"] = time.time()
+
+
+def revoke_tokens(user_id):
+    """Reject tokens whose claims were read before now.
+
+    Access tokens live for ``ACCESS_TOKEN_LIFETIME`` and refreshing one
+    reloads the claims, so the mark only has to be kept that long.
+    """
+    cache.set(
+        _revocation_key(user_id),
+        time.time(),
+        settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds()
+    )
+
+
+class ClaimsTokenUser(TokenUser):
+    @cached_property
+    def is_active(self):
+        return self.token.get("is_active", True)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """Authenticate from the token's claims without loading the user.
+
+    The user is a ``ClaimsTokenUser`` rather than a ``User`` instance, so
+    views have to use ``request.user.id`` for lookups. Tokens issued
+    before the user's staff or active flag or password changed are
+    rejected while the revocation mark is cached.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        revoked_at = cache.get(_revocation_key(user.id))
+        if (
+            revoked_at is not None
+            and validated_token.get("claims_iat", 0) <= revoked_at
+        ):
+            raise AuthenticationFailed(
+                _("Token has been revoked"), code="token_revoked"
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return user
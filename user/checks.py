@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.utils.module_loading import import_string
+
+from user.authentication import StatelessJWTAuthentication
+
+# Backends that keep entries per process, or not at all.
+UNSHARED_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register()
+def check_revocation_cache(app_configs, **kwargs):
+    """Token revocations only reach the workers that share the cache."""
+    authentication_classes = settings.REST_FRAMEWORK.get(
+        "DEFAULT_AUTHENTICATION_CLASSES", ()
+    )
+    uses_claims = any(
+        issubclass(import_string(path), StatelessJWTAuthentication)
+        for path in authentication_classes
+    )
+    backend = settings.CACHES["default"]["BACKEND"]
+    if not uses_claims or backend not in UNSHARED_CACHES:
+        return []
+    return [
+        Warning(
+            f"Token revocations are stored in {backend}, which other "
+            "worker processes cannot see.",
+            hint=(
+                "Demoted, deactivated or deleted users keep the claims of "
+                "their access tokens on other workers until the tokens "
+                "expire. Set CACHE_BACKEND to a cache shared by every "
+                "worker, such as FileBasedCache or RedisCache."
+            ),
+            id="user.W001",
+        )
+    ]
@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from user.authentication import revoke_tokens
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=User)
+def revoke_tokens_on_change(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        return
+    previous = (
+        User.objects
+        .filter(pk=instance.pk)
+        .values_list("is_staff", "is_active", "password")
+        .first()
+    )
+    if previous not in (
+        None, (instance.is_staff, instance.is_active, instance.password)
+    ):
+        user_id = instance.pk
+        transaction.on_commit(lambda: revoke_tokens(user_id))
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_delete(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: revoke_tokens(user_id))
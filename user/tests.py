@@ -1,3 +1,126 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from user.checks import check_revocation_cache
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+REFRESH_URL = reverse("user:token_refresh")
+ME_URL = reverse("user:manage")
+AIRPORT_URL = reverse("airport:airport-list")
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass", is_staff=True
+        )
+
+    def obtain_tokens(self):
+        res = self.client.post(
+            TOKEN_URL, {"email": "test@test.com", "password": "testpass"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def authenticate(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_token_carries_permission_claims(self):
+        access = AccessToken(self.obtain_tokens()["access"])
+
+        self.assertIs(access["is_staff"], True)
+        self.assertIs(access["is_active"], True)
+
+    def test_request_does_not_load_user(self):
+        self.authenticate(self.obtain_tokens()["access"])
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(
+                AIRPORT_URL, {"name": "Boryspil", "closest_big_city": "Kyiv"}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(any(
+            "user_user" in query["sql"]
+            for query in queries.captured_queries
+        ))
+
+    def test_demoted_user_token_revoked(self):
+        tokens = self.obtain_tokens()
+        self.user.is_staff = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        self.authenticate(tokens["access"])
+        self.assertEqual(
+            self.client.get(AIRPORT_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+        access = self.client.post(
+            REFRESH_URL, {"refresh": tokens["refresh"]}
+        ).data["access"]
+        self.assertIs(AccessToken(access)["is_staff"], False)
+        self.authenticate(access)
+        self.assertEqual(
+            self.client.get(AIRPORT_URL).status_code, status.HTTP_200_OK
+        )
+
+    def test_unrelated_change_keeps_token(self):
+        self.authenticate(self.obtain_tokens()["access"])
+        self.user.first_name = "John"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        res = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_refresh_rejected_for_inactive_user(self):
+        tokens = self.obtain_tokens()
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+
+        res = self.client.post(REFRESH_URL, {"refresh": tokens["refresh"]})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_manage_user_still_loads_user(self):
+        self.authenticate(self.obtain_tokens()["access"])
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], "test@test.com")
+
+
+class RevocationCacheCheckTests(SimpleTestCase):
+    def cache_settings(self, backend):
+        return override_settings(
+            CACHES={"default": {"BACKEND": backend, "LOCATION": "/tmp"}}
+        )
+
+    def test_warns_about_process_local_cache(self):
+        with self.cache_settings(
+            "django.core.cache.backends.locmem.LocMemCache"
+        ):
+            warnings = check_revocation_cache(None)
+
+        self.assertEqual([warning.id for warning in warnings], ["user.W001"])
+
+    def test_shared_cache_passes(self):
+        with self.cache_settings(
+            "django.core.cache.backends.filebased.FileBasedCache"
+        ):
+            self.assertEqual(check_revocation_cache(None), [])